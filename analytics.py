@@ -1,41 +1,133 @@
 """Analytics functionality for the dashboard"""
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
-from typing import Dict, List
-from config import THEME_COLORS
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+from config import THEME_COLORS, TREND_CONFIG
+from profiling import traced
+from rollup import add_trend_columns, moving_average_column
 
-def analyze_trends(df: pd.DataFrame, date_column: str, value_columns: List[str]) -> Dict:
-    """Analyze trends with improved error handling and validation"""
+OUTLIER_QUANTILES = (0.01, 0.99)
+
+SUMMARY_AGGREGATIONS = {
+    'sum': 'total',
+    'mean': 'average',
+    'median': 'median',
+    'min': 'min',
+    'max': 'max',
+    'std': 'std_dev',
+    'count': 'count'
+}
+
+def _period_trends(df: pd.DataFrame, date_column: str, value_columns: List[str],
+                   granularity: str = 'month') -> Dict:
+    """Per-period trends for every value column from a single grouped aggregation"""
+    if not value_columns:
+        return {}
+    freq = TREND_CONFIG['granularities'][granularity]['freq']
+    periods = df.groupby(pd.Grouper(key=date_column, freq=freq))[value_columns].agg(['sum', 'mean', 'count'])
     trends = {}
-    
     for value_col in value_columns:
-        if value_col not in df.columns:
-            continue
-            
-        monthly_data = df.groupby(pd.Grouper(key=date_column, freq='M'))[value_col].agg(['sum', 'mean', 'count'])
-        monthly_data['growth_rate'] = monthly_data['sum'].pct_change() * 100
-        monthly_data['3_month_ma'] = monthly_data['sum'].rolling(window=3, min_periods=1).mean()
-        trends[value_col] = monthly_data
-        
+        trends[value_col] = add_trend_columns(periods[value_col].copy(), granularity)
     return trends
 
-def create_trend_plot(trends_data: pd.DataFrame, value_column: str) -> go.Figure:
-    """Create an enhanced trend visualization"""
+def downsample_lttb(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """Positions of at most max_points points chosen by Largest-Triangle-Three-Buckets to keep a line's shape"""
+    n = len(y)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype='float64')
+    y = np.nan_to_num(np.asarray(y, dtype='float64'))
+
+    # The first and last points are kept; the rest are split into max_points - 2 buckets
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(max_points - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        following = slice(stop, edges[bucket + 2]) if bucket + 2 < len(edges) else slice(n - 1, n)
+        next_x, next_y = x[following].mean(), y[following].mean()
+        # Keep the point forming the largest triangle with the last kept point and the next bucket's mean
+        areas = np.abs((x[previous] - next_x) * (y[start:stop] - y[previous])
+                       - (x[previous] - x[start:stop]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return selected
+
+def _summary_stats(df: pd.DataFrame, value_columns: List[str]) -> Dict:
+    """Summary statistics for every value column from a single reduction pass"""
+    if not value_columns:
+        return {}
+    stats = df[value_columns].agg(list(SUMMARY_AGGREGATIONS))
+    summary = {}
+    for col in value_columns:
+        summary[col] = {name: stats.at[agg, col] for agg, name in SUMMARY_AGGREGATIONS.items()}
+        summary[col]['count'] = int(summary[col]['count'])
+    return summary
+
+@traced()
+def compute_sheet_analytics(df: pd.DataFrame, date_column: str, value_columns: List[str],
+                            rollup=None, start_date: Optional[date] = None, end_date: Optional[date] = None,
+                            filters: Optional[Dict[str, List]] = None,
+                            parts: Tuple[str, ...] = ('summary', 'trends'), granularity: str = 'month') -> Dict:
+    """Compute summary statistics and/or day, week or month trends for all value columns of a sheet"""
+    value_columns = [col for col in value_columns if col in df.columns]
+    analysis = {}
+    if rollup is not None:
+        # Only median, min and max are reduced from df, which must be the matching raw slice
+        if 'summary' in parts:
+            analysis['summary'] = rollup.summary(value_columns, start_date, end_date, filters, raw=df)
+        if 'trends' in parts:
+            analysis['trends'] = rollup.trends(value_columns, start_date, end_date, filters, granularity)
+        return analysis
+    if 'summary' in parts:
+        analysis['summary'] = _summary_stats(df, value_columns)
+    if 'trends' in parts:
+        analysis['trends'] = _period_trends(df, date_column, value_columns, granularity)
+    return analysis
+
+@traced()
+def analyze_trends(df: pd.DataFrame, date_column: str, value_columns: List[str],
+                   granularity: str = 'month') -> Dict:
+    """Analyze trends with improved error handling and validation"""
+    return _period_trends(df, date_column, [col for col in value_columns if col in df.columns], granularity)
+
+@traced()
+def create_trend_plot(trends_data: pd.DataFrame, value_column: str, granularity: str = 'month') -> go.Figure:
+    """Create an enhanced trend visualization, switching to downsampled WebGL lines for long histories"""
+    settings = TREND_CONFIG['granularities'][granularity]
+    ma_name = f"{settings['window']}-{granularity.capitalize()} Moving Average"
+    ma_column = moving_average_column(granularity)
     fig = go.Figure()
     
-    fig.add_trace(go.Bar(
-        x=trends_data.index,
-        y=trends_data['sum'],
-        name='Monthly Total',
-        marker_color=THEME_COLORS['primary']
-    ))
-    
-    fig.add_trace(go.Scatter(
-        x=trends_data.index,
-        y=trends_data['3_month_ma'],
-        name='3-Month Moving Average',
-        line=dict(color=THEME_COLORS['accent'], width=2)
-    ))
+    if len(trends_data) <= TREND_CONFIG['webgl_threshold']:
+        fig.add_trace(go.Bar(
+            x=trends_data.index,
+            y=trends_data['sum'],
+            name=f"{settings['label']} Total",
+            marker_color=THEME_COLORS['primary']
+        ))
+        fig.add_trace(go.Scatter(
+            x=trends_data.index,
+            y=trends_data[ma_column],
+            name=ma_name,
+            line=dict(color=THEME_COLORS['accent'], width=2)
+        ))
+    else:
+        # Thousands of SVG bars stall the browser; each line keeps only the points that shape it
+        x = trends_data.index.to_numpy(dtype='datetime64[ns]').astype(np.int64)
+        for column, name, color, width in [('sum', f"{settings['label']} Total", THEME_COLORS['primary'], 1),
+                                           (ma_column, ma_name, THEME_COLORS['accent'], 2)]:
+            keep = downsample_lttb(x, trends_data[column].to_numpy(), TREND_CONFIG['max_points'])
+            fig.add_trace(go.Scattergl(
+                x=trends_data.index[keep],
+                y=trends_data[column].to_numpy()[keep],
+                mode='lines',
+                name=name,
+                line=dict(color=color, width=width)
+            ))
     
     fig.update_layout(
         title=f'{value_column} Trends Over Time',
@@ -47,13 +139,51 @@ def create_trend_plot(trends_data: pd.DataFrame, value_column: str) -> go.Figure
     
     return fig
 
-def create_distribution_plot(df: pd.DataFrame, value_column: str) -> go.Figure:
-    """Create an enhanced distribution visualization"""
+@traced()
+def compute_histogram(values: pd.Series, bins: int = 30, log_scale: bool = False,
+                      clip_quantiles: Optional[Tuple[float, float]] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Bin values server-side, returning (counts, edges)"""
+    data = pd.to_numeric(values, errors='coerce').to_numpy(dtype='float64')
+    data = data[np.isfinite(data)]
+    if log_scale:
+        data = data[data > 0]
+    if data.size == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+
+    low, high = data.min(), data.max()
+    if clip_quantiles is not None:
+        low, high = np.quantile(data, clip_quantiles)
+        # Outliers are folded into the first and last bins
+        data = np.clip(data, low, high)
+    if low == high:
+        return np.array([data.size], dtype=np.int64), np.array([low, high])
+
+    if log_scale:
+        edges = np.geomspace(low, high, bins + 1)
+    else:
+        edges = np.linspace(low, high, bins + 1)
+    counts, edges = np.histogram(data, bins=edges)
+    return counts, edges
+
+@traced()
+def create_distribution_plot(df: pd.DataFrame, value_column: str, bins: int = 30, log_scale: bool = False,
+                             clip_outliers: bool = False) -> go.Figure:
+    """Create a distribution visualization from server-side bins, independent of row count"""
+    counts, edges = compute_histogram(
+        df[value_column], bins=bins, log_scale=log_scale,
+        clip_quantiles=OUTLIER_QUANTILES if clip_outliers else None
+    )
+    
+    # Log-scaled bins are drawn on a log10 axis so that bar widths stay uniform
+    positions = np.log10(edges) if log_scale and len(edges) else edges
     fig = go.Figure()
     
-    fig.add_trace(go.Histogram(
-        x=df[value_column],
-        nbinsx=30,
+    fig.add_trace(go.Bar(
+        x=(positions[:-1] + positions[1:]) / 2,
+        y=counts,
+        width=np.diff(positions) if len(positions) > 1 and positions[-1] > positions[0] else None,
+        customdata=np.column_stack([edges[:-1], edges[1:]]) if len(edges) > 1 else None,
+        hovertemplate='%{customdata[0]:,.2f} - %{customdata[1]:,.2f}<br>Count: %{y}<extra></extra>',
         name='Distribution',
         marker_color=THEME_COLORS['primary']
     ))
@@ -62,29 +192,19 @@ def create_distribution_plot(df: pd.DataFrame, value_column: str) -> go.Figure:
         title=f'{value_column} Distribution',
         template='plotly_white',
         showlegend=False,
+        bargap=0,
         margin=dict(l=20, r=20, t=40, b=20),
-        xaxis_title=value_column,
+        xaxis_title=f'{value_column} (log scale)' if log_scale else value_column,
         yaxis_title='Frequency'
     )
     
+    if log_scale and len(positions):
+        ticks = np.arange(np.floor(positions[0]), np.ceil(positions[-1]) + 1)
+        fig.update_xaxes(tickvals=ticks, ticktext=[f"{10 ** tick:,.0f}" if tick >= 0 else f"{10 ** tick:g}" for tick in ticks])
+    
     return fig
 
+@traced()
 def generate_summary_stats(df: pd.DataFrame, value_columns: List[str]) -> Dict:
     """Generate comprehensive summary statistics"""
-    summary = {}
-    
-    for col in value_columns:
-        if col not in df.columns:
-            continue
-            
-        summary[col] = {
-            'total': df[col].sum(),
-            'average': df[col].mean(),
-            'median': df[col].median(),
-            'min': df[col].min(),
-            'max': df[col].max(),
-            'std_dev': df[col].std(),
-            'count': df[col].count()
-        }
-    
-    return summary
\ No newline at end of file
+    return _summary_stats(df, [col for col in value_columns if col in df.columns])
@@ -1,16 +1,21 @@
 """Main Streamlit dashboard application"""
 import streamlit as st
 import logging
+from contextlib import nullcontext
 from datetime import datetime, timedelta
-from config import SHEET_CONFIG, CSS_STYLES, THEME_COLORS
-from data_processor import DataProcessor
+from config import (
+    SHEET_CONFIG, CSS_STYLES, PROFILING_CONFIG, RECONCILIATION_CONFIG, TABLE_CONFIG, THEME_COLORS, TREND_CONFIG,
+    WORKBOOK_PATH
+)
+from profiling import recording, span
+from reconciliation import reconcile
+from refresh_worker import get_refresh_worker
+from shared_store import get_shared_store
 from analytics import (
-    analyze_trends,
+    compute_sheet_analytics,
     create_trend_plot,
-    create_distribution_plot,
-    generate_summary_stats
+    create_distribution_plot
 )
-from cache_manager import CacheManager
 
 # Configure logging
 logging.basicConfig(
@@ -45,14 +50,334 @@ def create_summary_cards(summary_stats: dict, value_column: str):
         logger.error(f"Error creating summary cards: {e}")
         st.error("Unable to display summary cards")
 
+def render_category_filters(processor, sheet_name: str) -> dict:
+    """Render multi-selects for the sheet's filter columns and return the active selections"""
+    filter_index = processor.get_filter_index(sheet_name)
+    if filter_index is None:
+        return {}
+    columns = [col for col in SHEET_CONFIG[sheet_name]['filter_columns'] if col in filter_index.columns]
+    if not columns:
+        return {}
+    
+    selections = {}
+    for col, container in zip(columns, st.columns(len(columns))):
+        with container:
+            selections[col] = st.multiselect(
+                col,
+                options=filter_index.options(col),
+                key=f"filter_{sheet_name}_{col}",
+                help=f"Leave empty to include every {col}"
+            )
+    return {col: values for col, values in selections.items() if values}
+
+def render_data_table(processor, sheet_name: str, date_filter: tuple, filters: dict):
+    """Render one server-side page of the sheet with search, sorting and CSV export"""
+    config = SHEET_CONFIG[sheet_name]
+    columns = list(processor.get_sheet_data(sheet_name).columns)
+    
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        search = st.text_input(
+            "Search",
+            help=f"Case-insensitive match on {', '.join(config['key_columns'])}"
+        ).strip()
+    with col2:
+        sort_by = st.selectbox("Sort by", options=["(none)"] + columns)
+    with col3:
+        descending = st.checkbox("Descending", value=True)
+    sort_by = None if sort_by == "(none)" else sort_by
+    query = dict(search=search or None, sort_by=sort_by, ascending=not descending, filters=filters)
+    
+    total_rows = len(processor.table_positions(sheet_name, *date_filter, **query))
+    page_size = TABLE_CONFIG['page_size']
+    page_count = max(1, -(-total_rows // page_size))
+    page = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1)
+    
+    page_df, _ = processor.query_table(sheet_name, *date_filter, **query, page=page - 1, page_size=page_size)
+    st.dataframe(page_df, use_container_width=True, height=400)
+    st.caption(f"Showing {len(page_df):,} of {total_rows:,} matching rows (page {page} of {page_count})")
+    
+    if st.button("Prepare CSV download", help="Export every matching row, not just this page"):
+        st.download_button(
+            "⬇️ Download full result",
+            data=processor.export_table_csv(sheet_name, *date_filter, **query),
+            file_name=f"{sheet_name}.csv",
+            mime="text/csv"
+        )
+
+def render_reconciliation(processor):
+    """Show how pending orders flowed into the invoiced sheets, stuck orders and duplicate keys"""
+    stuck_after_days = st.number_input(
+        "Flag pending orders older than (days)",
+        min_value=1,
+        value=RECONCILIATION_CONFIG['stuck_after_days'],
+        step=1,
+        help="Pending orders with no invoiced row after this many days are listed as stuck"
+    )
+    results = reconcile(processor, stuck_after_days=int(stuck_after_days))
+    if not results:
+        st.info("No pending/invoiced sheet pairs are loaded")
+        return
+    
+    for name, result in results.items():
+        st.markdown(f"**{name}: {result.pending_sheet} → {result.invoiced_sheet}**")
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("In both sheets", f"{result.counts['in_both']:,}")
+        col2.metric(f"Stuck > {int(stuck_after_days)} days", f"{result.counts['stuck']:,}")
+        col3.metric("Duplicate keys", f"{result.counts['duplicate_keys']:,}")
+        median = result.latency.get('median_days')
+        col4.metric("Median conversion", f"{median:,.1f} days" if median is not None else "n/a")
+        
+        with st.expander(f"{name}: stuck orders"):
+            page_size = TABLE_CONFIG['page_size']
+            st.dataframe(result.stuck.head(page_size), use_container_width=True)
+            st.caption(f"Showing the {min(page_size, len(result.stuck)):,} oldest of {len(result.stuck):,}")
+        with st.expander(f"{name}: duplicate keys"):
+            st.dataframe(result.duplicates, use_container_width=True)
+
+def render_order_search(processor):
+    """Find an order by any of its identifiers across every sheet"""
+    query = st.text_input(
+        "Find an order",
+        placeholder="SO#, SO, OrderID, Invoice#, Reference or AutodeskOrder#",
+        help="Exact matches first, then identifiers starting with what you typed"
+    ).strip()
+    if not query:
+        return
+    
+    results = processor.find_orders(query)
+    if not results:
+        st.info(f"No order matches {query}")
+        return
+    for sheet_name, rows in results.items():
+        st.caption(f"{sheet_name}: {len(rows):,} matching rows")
+        st.dataframe(rows, use_container_width=True)
+
+def render_memory_footprint(processor):
+    """Show per-sheet memory use before and after compaction in the sidebar"""
+    with st.sidebar.expander("Memory footprint"):
+        report = processor.memory_report() / (1024 * 1024)
+        st.dataframe(report.style.format("{:,.1f} MB"), use_container_width=True)
+        st.caption(f"Total: {report['after'].sum():,.1f} MB (was {report['before'].sum():,.1f} MB)")
+
+def render_data_status(processor, worker):
+    """Show which data version is being served and the state of the background refresh"""
+    as_of = processor.source_modified_at or processor.loaded_at
+    status = f"Data as of {as_of.strftime('%Y-%m-%d %H:%M:%S')} (loaded {processor.loaded_at.strftime('%H:%M:%S')})"
+    if worker.refreshing:
+        status += " · ⏳ reloading in the background"
+    st.caption(status)
+    if worker.last_error:
+        st.warning(f"Last background refresh failed: {worker.last_error}")
+
+def render_performance_panel(recorder, data_version):
+    """Show where this rerun spent its time and offer the spans as JSON lines"""
+    context = {'data_version': data_version, 'recorded_at': datetime.now().isoformat(timespec='seconds')}
+    if PROFILING_CONFIG['export_path']:
+        recorder.export_jsonl(PROFILING_CONFIG['export_path'], **context)
+    
+    with st.expander("Performance", expanded=False):
+        if not recorder.spans:
+            st.caption("No instrumented calls ran in this rerun")
+            return
+        total_ms = sum(span.duration_ms for span in recorder.spans if span.depth == 0)
+        lookups = [span.attributes['hit'] for span in recorder.spans if 'hit' in span.attributes]
+        st.caption(f"{total_ms:,.1f} ms across {len(recorder.spans)} spans · "
+                   f"cache {sum(lookups)} hits / {len(lookups) - sum(lookups)} misses")
+        st.dataframe(recorder.to_frame(), use_container_width=True, height=320)
+        st.download_button(
+            "Download spans (JSON lines)",
+            data=recorder.to_jsonl(**context),
+            file_name="spans.jsonl",
+            mime="application/jsonl"
+        )
+
 def initialize_session_state():
-    """Initialize session state variables"""
-    if 'data_processor' not in st.session_state:
-        st.session_state.data_processor = DataProcessor("Copy of Autodesk Order Tracker(1).xlsx")
-    if 'cache_manager' not in st.session_state:
-        st.session_state.cache_manager = CacheManager()
-    if 'last_update' not in st.session_state:
-        st.session_state.last_update = datetime.now()
+    """Initialize per-session filter selections; loaded data lives in the shared store"""
+    if 'date_filter' not in st.session_state:
+        st.session_state.date_filter = (None, None)
+
+def fragment(func):
+    """Rerun a section on its own widget changes where this Streamlit supports fragments"""
+    decorator = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None)
+    return decorator(func) if decorator is not None else func
+
+def get_sheet_analytics(processor, sheet_name, date_filter, filters, part, granularity='month'):
+    """Summary or trends for the filtered sheet, computed only when a section needs them"""
+    config = SHEET_CONFIG[sheet_name]
+    rollup = processor.get_rollup(sheet_name)
+    
+    def compute():
+        # Trends come entirely from the rollup, so only the summary needs the filtered rows
+        if part == 'summary' or rollup is None:
+            df = processor.get_sheet_data(sheet_name, *date_filter, filters=filters)
+        else:
+            df = processor.get_sheet_data(sheet_name)
+        return compute_sheet_analytics(
+            df, config['date_column'], config['value_columns'], rollup=rollup,
+            start_date=date_filter[0], end_date=date_filter[1], filters=filters, parts=(part,),
+            granularity=granularity
+        )[part]
+    
+    return processor.cache_manager.memoize(
+        f"sheet_{part}",
+        compute,
+        sheet=sheet_name,
+        params=(date_filter, filters, granularity),
+        version=processor.data_version
+    )
+
+def render_overview(processor, sheet_name, date_filter, filters):
+    """Summary cards and the paged data table"""
+    config = SHEET_CONFIG[sheet_name]
+    st.subheader("Summary Statistics")
+    summary = get_sheet_analytics(processor, sheet_name, date_filter, filters, 'summary')
+    for value_col in config['value_columns']:
+        create_summary_cards(summary[value_col], value_col)
+    
+    st.subheader("Data Table")
+    render_data_table(processor, sheet_name, date_filter, filters)
+
+def render_trends(processor, sheet_name, date_filter, filters):
+    """Monthly trend chart per value column"""
+    config = SHEET_CONFIG[sheet_name]
+    st.subheader("Trend Analysis")
+    granularity = st.radio(
+        "Granularity",
+        options=list(TREND_CONFIG['granularities']),
+        index=list(TREND_CONFIG['granularities']).index('month'),
+        format_func=lambda option: TREND_CONFIG['granularities'][option]['label'],
+        horizontal=True
+    )
+    trends = get_sheet_analytics(processor, sheet_name, date_filter, filters, 'trends', granularity)
+    for value_col in config['value_columns']:
+        with st.spinner(f"Generating trend analysis for {value_col}..."):
+            fig = create_trend_plot(trends[value_col], value_col, granularity)
+            with span("st.plotly_chart", column=value_col):
+                st.plotly_chart(fig, use_container_width=True)
+
+def render_distribution(processor, sheet_name, date_filter, filters):
+    """Histogram per value column with log scale and outlier clipping toggles"""
+    config = SHEET_CONFIG[sheet_name]
+    st.subheader("Distribution Analysis")
+    col1, col2 = st.columns(2)
+    with col1:
+        log_scale = st.checkbox("Log scale", help="Bin values on a logarithmic scale")
+    with col2:
+        clip_outliers = st.checkbox(
+            "Clip outliers",
+            help="Fold values outside the 1st-99th percentile into the edge bins"
+        )
+    
+    # The filtered rows are only materialized when a figure is not cached yet
+    df = None
+    for value_col in config['value_columns']:
+        with st.spinner(f"Generating distribution analysis for {value_col}..."):
+            def compute(value_col=value_col):
+                nonlocal df
+                if df is None:
+                    df = processor.get_sheet_data(sheet_name, *date_filter, filters=filters)
+                return create_distribution_plot(df, value_col, log_scale=log_scale, clip_outliers=clip_outliers)
+            
+            fig = processor.cache_manager.memoize(
+                "distribution",
+                compute,
+                sheet=sheet_name,
+                column=value_col,
+                params=(date_filter, filters, log_scale, clip_outliers),
+                version=processor.data_version
+            )
+            with span("st.plotly_chart", column=value_col):
+                st.plotly_chart(fig, use_container_width=True)
+
+def render_reconciliation_section(processor, sheet_name, date_filter, filters):
+    """Reconciliation across sheets; the sheet and filters do not apply"""
+    st.subheader("Order Lifecycle Reconciliation")
+    render_reconciliation(processor)
+
+# Only the selected section runs on a rerun; tabs would execute every section's code each time
+SECTIONS = {
+    "Overview 📊": render_overview,
+    "Trends Analysis 📈": render_trends,
+    "Distribution Analysis 📉": render_distribution,
+    "Reconciliation 🔁": render_reconciliation_section
+}
+
+@fragment
+def render_section(store, section, sheet_name, date_filter, filters):
+    """Render one analysis section; a fragment rerun leases whichever data version is current then"""
+    with store.lease(WORKBOOK_PATH) as processor:
+        if processor is None or processor.get_sheet_data(sheet_name) is None:
+            st.error("No data available for the selected sheet")
+            return
+        SECTIONS[section](processor, sheet_name, date_filter, filters)
+
+def render_dashboard(store, processor):
+    """Render filters and the selected analysis section for the current data version"""
+    # Date filters with improved UX
+    col1, col2 = st.columns(2)
+    with col1:
+        start_date = st.date_input(
+            "Start date",
+            datetime.now() - timedelta(days=30),
+            help="Select start date for filtering data"
+        )
+    with col2:
+        end_date = st.date_input(
+            "End date",
+            datetime.now(),
+            help="Select end date for filtering data"
+        )
+    
+    # Sheet selector with search
+    sheet_option = st.selectbox(
+        "Select a sheet to view",
+        options=list(SHEET_CONFIG.keys()),
+        help="Choose which data sheet to analyze"
+    )
+    
+    filters = render_category_filters(processor, sheet_option)
+    render_memory_footprint(processor)
+    
+    # Apply filters with loading indicator
+    if st.button("Apply Filters", help="Click to apply date filters to the data"):
+        st.session_state.date_filter = (start_date, end_date)
+        st.success("Filters applied successfully!")
+    
+    section = st.radio(
+        "Section",
+        options=list(SECTIONS),
+        horizontal=True,
+        key="section",
+        label_visibility="collapsed"
+    )
+    
+    render_section(store, section, sheet_option, st.session_state.date_filter, filters)
+
+def render_app(store, refresh_column, recorder):
+    """Load and lease the shared data, render the dashboard and, when profiling, the performance panel"""
+    # Load data if not already loaded; concurrent sessions share a single load
+    success, error_message = store.ensure_loaded(WORKBOOK_PATH)
+    if not store.is_loaded(WORKBOOK_PATH):
+        st.error(f"Error loading data: {error_message}")
+        return
+    if not success:
+        st.warning(f"Some sheets could not be loaded: {error_message}")
+    
+    # Later reloads happen in the background and are swapped in when complete
+    worker = get_refresh_worker(store, WORKBOOK_PATH)
+    
+    with refresh_column:
+        if st.button("🔄 Refresh Data"):
+            worker.request_refresh()
+            st.info("Refresh started in the background")
+    
+    with store.lease(WORKBOOK_PATH) as processor:
+        render_data_status(processor, worker)
+        render_order_search(processor)
+        render_dashboard(store, processor)
+        if recorder is not None:
+            render_performance_panel(recorder, processor.data_version)
 
 def main():
     """Main application entry point"""
@@ -64,6 +389,8 @@ def main():
     
     # Initialize session state
     initialize_session_state()
+    store = get_shared_store()
+    store.cache_manager.add_clear_hook(st.cache_data.clear)
     
     # Apply custom CSS
     st.markdown(CSS_STYLES, unsafe_allow_html=True)
@@ -72,107 +399,16 @@ def main():
     col1, col2 = st.columns([3, 1])
     with col1:
         st.title("Order Tracking Dashboard")
-    with col2:
-        if st.button("🔄 Refresh Data"):
-            st.session_state.cache_manager.clear_cache()
-            success, error_message = st.session_state.data_processor.load_data()
-            if not success:
-                st.error(f"Error refreshing data: {error_message}")
-            else:
-                st.session_state.last_update = datetime.now()
-                st.success("Data refreshed successfully!")
     
-    st.caption(f"Last updated: {st.session_state.last_update.strftime('%Y-%m-%d %H:%M:%S')}")
+    # Spans are only collected while profiling is switched on, so normal reruns pay nothing
+    profiling = st.sidebar.checkbox("Profile reruns", help="Time loading, analytics and plotting for this rerun")
     
     try:
-        # Load data if not already loaded
-        if not st.session_state.data_processor.sheets_data:
-            success, error_message = st.session_state.data_processor.load_data()
-            if not success:
-                st.error(f"Error loading data: {error_message}")
-                return
-        
-        # Date filters with improved UX
-        col1, col2 = st.columns(2)
-        with col1:
-            start_date = st.date_input(
-                "Start date",
-                datetime.now() - timedelta(days=30),
-                help="Select start date for filtering data"
-            )
-        with col2:
-            end_date = st.date_input(
-                "End date",
-                datetime.now(),
-                help="Select end date for filtering data"
-            )
-        
-        # Sheet selector with search
-        sheet_option = st.selectbox(
-            "Select a sheet to view",
-            options=list(SHEET_CONFIG.keys()),
-            help="Choose which data sheet to analyze"
-        )
-        
-        # Apply filters with loading indicator
-        if st.button("Apply Filters", help="Click to apply date filters to the data"):
-            with st.spinner("Applying filters..."):
-                st.session_state.data_processor.filter_by_date(start_date, end_date)
-            st.success("Filters applied successfully!")
-        
-        # Create tabs with loading states
-        tab_overview, tab_trends, tab_distribution = st.tabs([
-            "Overview 📊",
-            "Trends Analysis 📈",
-            "Distribution Analysis 📉"
-        ])
-        
-        df = st.session_state.data_processor.get_sheet_data(sheet_option)
-        if df is not None:
-            config = SHEET_CONFIG[sheet_option]
-            
-            with tab_overview:
-                st.subheader("Summary Statistics")
-                for value_col in config['value_columns']:
-                    summary_stats = st.session_state.cache_manager.cache_analysis(
-                        f"summary_{sheet_option}_{value_col}",
-                        generate_summary_stats(df, [value_col])[value_col]
-                    )
-                    create_summary_cards(summary_stats, value_col)
-                
-                st.subheader("Data Table")
-                st.dataframe(
-                    df,
-                    use_container_width=True,
-                    height=400
-                )
-            
-            with tab_trends:
-                st.subheader("Trend Analysis")
-                for value_col in config['value_columns']:
-                    with st.spinner(f"Generating trend analysis for {value_col}..."):
-                        trends = st.session_state.cache_manager.cache_analysis(
-                            f"trends_{sheet_option}_{value_col}",
-                            analyze_trends(df, config['date_column'], [value_col])
-                        )
-                        fig = create_trend_plot(trends[value_col], value_col)
-                        st.plotly_chart(fig, use_container_width=True)
-            
-            with tab_distribution:
-                st.subheader("Distribution Analysis")
-                for value_col in config['value_columns']:
-                    with st.spinner(f"Generating distribution analysis for {value_col}..."):
-                        fig = st.session_state.cache_manager.cache_analysis(
-                            f"distribution_{sheet_option}_{value_col}",
-                            create_distribution_plot(df, value_col)
-                        )
-                        st.plotly_chart(fig, use_container_width=True)
-        else:
-            st.error("No data available for the selected sheet")
-    
+        with recording() if profiling else nullcontext() as recorder:
+            render_app(store, col2, recorder)
     except Exception as e:
         logger.error(f"Application error: {e}")
         st.error("An error occurred while running the application. Please try refreshing the page.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,260 @@
+"""Headless report generator: summaries, monthly trends and distributions for every sheet
+
+Usage:
+    python batch_report.py "Copy of Autodesk Order Tracker(1).xlsx" --output-dir reports
+    python batch_report.py tracker_jan.xlsx tracker_feb.xlsx --window 2023-01-01:2023-03-31 --window : --format csv
+"""
+import argparse
+import concurrent.futures
+import html
+import logging
+import os
+import re
+import sys
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+from plotly.offline import get_plotlyjs, get_plotlyjs_version
+from analytics import (
+    OUTLIER_QUANTILES,
+    compute_histogram,
+    compute_sheet_analytics,
+    create_distribution_plot,
+    create_trend_plot
+)
+from config import SHEET_CONFIG
+from data_processor import DataProcessor
+
+logger = logging.getLogger(__name__)
+
+REPORT_FORMATS = ('html', 'csv')
+
+@dataclass(frozen=True)
+class ReportTask:
+    """One unit of work for the pool: a value column of a sheet, in one workbook and date window"""
+    file_path: str
+    start_date: Optional[date]
+    end_date: Optional[date]
+    sheet_name: str
+    value_column: str
+    bins: int = 30
+    clip_outliers: bool = False
+    render_html: bool = True
+
+# Each worker process loads a workbook once and reuses it for every task that reads it
+_processors: Dict[str, DataProcessor] = {}
+
+def _processor(file_path: str) -> DataProcessor:
+    """The loaded processor for a workbook in this process, loading it on first use"""
+    processor = _processors.get(file_path)
+    if processor is None:
+        processor = DataProcessor(file_path)
+        success, error_message = processor.load_data()
+        if not processor.sheets_data:
+            raise RuntimeError(error_message or f"No sheets could be loaded from {file_path}")
+        _processors[file_path] = processor
+    return processor
+
+def parse_window(text: str) -> Tuple[Optional[date], Optional[date]]:
+    """Parse START:END (either side may be empty) into a date window"""
+    start, _, end = text.partition(':')
+    return (date.fromisoformat(start) if start else None, date.fromisoformat(end) if end else None)
+
+def window_label(window: Tuple[Optional[date], Optional[date]]) -> str:
+    """Directory-safe name of a date window"""
+    start, end = window
+    if start is None and end is None:
+        return 'all'
+    return f"{start.isoformat() if start else 'start'}_{end.isoformat() if end else 'end'}"
+
+def _slug(text: str) -> str:
+    """Lower-case text with runs of other characters replaced by underscores"""
+    return re.sub(r'[^A-Za-z0-9]+', '_', text).strip('_').lower()
+
+def report_labels(file_paths: List[str]) -> Dict[str, str]:
+    """Directory-safe label per workbook, qualified by its parent directory (then position) when names clash"""
+    stems = [_slug(os.path.splitext(os.path.basename(path))[0]) for path in file_paths]
+    labels = [
+        stem if stems.count(stem) == 1 else f"{stem}_{_slug(os.path.basename(os.path.dirname(os.path.abspath(path))))}"
+        for path, stem in zip(file_paths, stems)
+    ]
+    # Copies in identically named folders still need distinct directories
+    return {path: label if labels.count(label) == 1 else f"{label}_{position + 1}"
+            for position, (path, label) in enumerate(zip(file_paths, labels))}
+
+def run_task(task: ReportTask) -> Optional[Dict]:
+    """Compute the summary, monthly trends, histogram and figures for one sheet column"""
+    started = time.perf_counter()
+    processor = _processor(task.file_path)
+    df = processor.get_sheet_data(task.sheet_name, task.start_date, task.end_date)
+    if df is None or task.value_column not in df.columns:
+        return None
+
+    config = SHEET_CONFIG[task.sheet_name]
+    analysis = compute_sheet_analytics(
+        df, config['date_column'], [task.value_column], rollup=processor.get_rollup(task.sheet_name),
+        start_date=task.start_date, end_date=task.end_date
+    )
+    trends = analysis['trends'][task.value_column]
+    counts, edges = compute_histogram(
+        df[task.value_column], bins=task.bins,
+        clip_quantiles=OUTLIER_QUANTILES if task.clip_outliers else None
+    )
+    result = {
+        'task': task,
+        'summary': analysis['summary'][task.value_column],
+        'trends': trends,
+        'distribution': pd.DataFrame({'bin_start': edges[:-1], 'bin_end': edges[1:], 'count': counts}),
+        'rows': len(df)
+    }
+    if task.render_html:
+        # Figures are serialized in the worker; plotly.js is added once per page by the writer
+        result['trend_html'] = create_trend_plot(trends, task.value_column).to_html(
+            full_html=False, include_plotlyjs=False)
+        result['distribution_html'] = create_distribution_plot(
+            df, task.value_column, bins=task.bins, clip_outliers=task.clip_outliers
+        ).to_html(full_html=False, include_plotlyjs=False)
+    result['seconds'] = time.perf_counter() - started
+    return result
+
+def run_tasks(tasks: List[ReportTask], workers: int) -> List[Dict]:
+    """Run tasks across a process pool, or inline with a single worker, keeping task order"""
+    if workers <= 1:
+        results = [run_task(task) for task in tasks]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(run_task, tasks))
+    return [result for result in results if result is not None]
+
+def summary_frame(results: List[Dict]) -> pd.DataFrame:
+    """One row per sheet and value column"""
+    return pd.DataFrame([{
+        'sheet': result['task'].sheet_name,
+        'value_column': result['task'].value_column,
+        'rows': result['rows'],
+        **result['summary']
+    } for result in results])
+
+def _long_frame(results: List[Dict], key: str) -> pd.DataFrame:
+    """Per-task frames stacked with sheet and value column labels"""
+    frames = [
+        result[key].reset_index().assign(sheet=result['task'].sheet_name, value_column=result['task'].value_column)
+        for result in results
+    ]
+    if not frames:
+        return pd.DataFrame()
+    stacked = pd.concat(frames, ignore_index=True)
+    return stacked[['sheet', 'value_column'] + [col for col in stacked.columns if col not in ('sheet', 'value_column')]]
+
+def write_csv(results: List[Dict], directory: str) -> List[str]:
+    """Write summary, trends and distribution tables as CSV files"""
+    paths = []
+    for name, frame in [('summary', summary_frame(results)),
+                        ('trends', _long_frame(results, 'trends')),
+                        ('distribution', _long_frame(results, 'distribution'))]:
+        path = os.path.join(directory, f"{name}.csv")
+        frame.to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+def write_html(results: List[Dict], directory: str, title: str, embed_plotlyjs: bool = False) -> str:
+    """Write a single static HTML page with the summary table and every figure"""
+    if embed_plotlyjs:
+        script = f"<script type=\"text/javascript\">{get_plotlyjs()}</script>"
+    else:
+        script = f"<script src=\"https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js\"></script>"
+
+    sections = []
+    for sheet_name in SHEET_CONFIG:
+        sheet_results = [result for result in results if result['task'].sheet_name == sheet_name]
+        if not sheet_results:
+            continue
+        sections.append(f"<h2>{html.escape(sheet_name)}</h2>")
+        sections.append(summary_frame(sheet_results).drop(columns='sheet').to_html(
+            index=False, float_format=lambda value: f"{value:,.2f}"))
+        for result in sheet_results:
+            sections.append(f"<h3>{html.escape(result['task'].value_column)}</h3>")
+            sections.append(result.get('trend_html', ''))
+            sections.append(result.get('distribution_html', ''))
+
+    page = (
+        f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>{html.escape(title)}</title>{script}"
+        "<style>body{font-family:sans-serif;margin:2em}table{border-collapse:collapse}"
+        "td,th{border:1px solid #ddd;padding:4px 8px;text-align:right}</style></head>"
+        f"<body><h1>{html.escape(title)}</h1>{''.join(sections)}</body></html>"
+    )
+    path = os.path.join(directory, 'report.html')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(page)
+    return path
+
+def build_tasks(file_paths: List[str], windows: List[Tuple[Optional[date], Optional[date]]],
+                bins: int = 30, clip_outliers: bool = False, render_html: bool = True) -> List[ReportTask]:
+    """Fan out every workbook and window to one task per sheet and value column"""
+    return [
+        ReportTask(file_path, start, end, sheet_name, value_column, bins, clip_outliers, render_html)
+        for file_path in file_paths
+        for start, end in windows
+        for sheet_name, config in SHEET_CONFIG.items()
+        for value_column in config['value_columns']
+    ]
+
+def generate_reports(file_paths: List[str], windows: List[Tuple[Optional[date], Optional[date]]],
+                     output_dir: str, formats: Tuple[str, ...] = REPORT_FORMATS, workers: int = 1,
+                     bins: int = 30, clip_outliers: bool = False, embed_plotlyjs: bool = False) -> List[str]:
+    """Generate one report directory per workbook and date window, returning the files written"""
+    file_paths = list(dict.fromkeys(file_paths))
+    labels = report_labels(file_paths)
+    # Load each workbook once up front so workers start from its snapshot instead of parsing Excel
+    for file_path in file_paths:
+        _processor(file_path)
+
+    tasks = build_tasks(file_paths, windows, bins, clip_outliers, render_html='html' in formats)
+    results = run_tasks(tasks, workers)
+
+    written = []
+    for file_path in file_paths:
+        for window in windows:
+            group = [result for result in results
+                     if result['task'].file_path == file_path
+                     and (result['task'].start_date, result['task'].end_date) == window]
+            directory = os.path.join(output_dir, f"{labels[file_path]}_{window_label(window)}")
+            os.makedirs(directory, exist_ok=True)
+            if 'csv' in formats:
+                written.extend(write_csv(group, directory))
+            if 'html' in formats:
+                title = f"{os.path.basename(file_path)} ({window_label(window).replace('_', ' to ')})"
+                written.append(write_html(group, directory, title, embed_plotlyjs))
+            logger.info(f"{file_path} {window_label(window)}: {len(group)} sheet columns in "
+                        f"{sum(result['seconds'] for result in group):.2f}s of worker time")
+    return written
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('workbooks', nargs='+', help='Workbooks to report on')
+    parser.add_argument('--window', action='append', type=parse_window,
+                        help='Date window START:END (ISO dates, either side may be empty); repeatable')
+    parser.add_argument('--output-dir', default='reports', help='Directory to write reports into')
+    parser.add_argument('--format', nargs='+', choices=REPORT_FORMATS, default=list(REPORT_FORMATS),
+                        help='Output formats')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Worker processes')
+    parser.add_argument('--bins', type=int, default=30, help='Histogram bins')
+    parser.add_argument('--clip-outliers', action='store_true', help='Fold outliers into the edge bins')
+    parser.add_argument('--embed-plotlyjs', action='store_true',
+                        help='Embed plotly.js in the HTML so it opens offline')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    started = time.perf_counter()
+    written = generate_reports(args.workbooks, args.window or [(None, None)], args.output_dir,
+                               tuple(args.format), args.workers, args.bins, args.clip_outliers,
+                               args.embed_plotlyjs)
+    for path in written:
+        print(path)
+    logger.info(f"Wrote {len(written)} files in {time.perf_counter() - started:.2f}s")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
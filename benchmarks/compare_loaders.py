@@ -0,0 +1,59 @@
+"""Timing comparison between the per-sheet read_excel path and the single-pass loader
+
+Usage:
+    python benchmarks/compare_loaders.py "Copy of Autodesk Order Tracker(1).xlsx" --repeat 3
+"""
+import argparse
+import concurrent.futures
+import os
+import sys
+import time
+from typing import Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from config import SHEET_CONFIG
+from workbook_loader import read_workbook_sheets
+
+def load_per_sheet(file_path: str) -> dict:
+    """Previous path: one read_excel call (and one workbook parse) per configured sheet"""
+    def read(sheet_name):
+        return pd.read_excel(file_path, sheet_name=sheet_name)
+
+    with concurrent.futures.ThreadPoolExecutor() as executor:
+        futures = {executor.submit(read, name): name for name in SHEET_CONFIG}
+        return {futures[f]: f.result() for f in concurrent.futures.as_completed(futures)}
+
+def load_single_pass(file_path: str) -> dict:
+    """Current path: open the workbook once and stream the configured columns"""
+    return read_workbook_sheets(file_path, SHEET_CONFIG)
+
+def time_loader(loader: Callable[[str], dict], file_path: str, repeat: int) -> List[float]:
+    """Return wall-clock durations in seconds for each repetition"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        loader(file_path)
+        durations.append(time.perf_counter() - start)
+    return durations
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('file_path', help='Workbook to load')
+    parser.add_argument('--repeat', type=int, default=3, help='Repetitions per loader')
+    args = parser.parse_args(argv)
+
+    results = {
+        'per-sheet read_excel': time_loader(load_per_sheet, args.file_path, args.repeat),
+        'single-pass loader': time_loader(load_single_pass, args.file_path, args.repeat),
+    }
+    baseline = min(results['per-sheet read_excel'])
+    for name, durations in results.items():
+        best = min(durations)
+        print(f"{name:<22} best {best:8.3f}s  mean {sum(durations) / len(durations):8.3f}s  "
+              f"speedup {baseline / best:5.2f}x")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
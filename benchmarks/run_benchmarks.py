@@ -0,0 +1,188 @@
+"""Benchmark suite for loading, preprocessing, analytics and plotting on synthetic workbooks
+
+Usage:
+    python benchmarks/run_benchmarks.py --sizes 10000 100000 --output results.json
+    python benchmarks/run_benchmarks.py --sizes 10000 --baseline results.json --threshold 0.2
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from datetime import datetime
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from analytics import analyze_trends, create_distribution_plot, create_trend_plot, generate_summary_stats
+from config import SHEET_CONFIG
+from data_processor import DataProcessor
+from snapshot_cache import SnapshotCache
+from workbook_loader import read_workbook_sheets
+from benchmarks.synthetic_workbook import write_workbook
+
+RESULTS_FORMAT_VERSION = 1
+BENCHMARK_SHEET = 'Manual Orders Not Invoiced'
+FILTER_WINDOW = (datetime(2022, 3, 1), datetime(2022, 5, 31))
+# Timing differences below this are scheduler noise, whatever the ratio
+MIN_REGRESSION_SECONDS = 0.005
+
+def measure(func: Callable[[], object], repeat: int) -> Dict[str, float]:
+    """Best and mean wall-clock seconds over the repetitions, plus peak traced memory of one run"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+
+    # Memory is traced in a separate run so tracing overhead does not skew the timings
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'seconds_best': min(durations),
+        'seconds_mean': sum(durations) / len(durations),
+        'peak_bytes': int(peak),
+        'repeat': repeat
+    }
+
+def workbook_for(rows: int, seed: int, workdir: str) -> str:
+    """Generate the synthetic workbook for a size once and reuse it across runs"""
+    path = os.path.join(workdir, f"tracker_{rows}_seed{seed}.xlsx")
+    if not os.path.exists(path):
+        print(f"Generating {path}...", file=sys.stderr)
+        write_workbook(path, rows, seed)
+    return path
+
+def run_size(file_path: str, repeat: int) -> Dict[str, Dict[str, float]]:
+    """Time every benchmarked stage against one workbook"""
+    config = SHEET_CONFIG[BENCHMARK_SHEET]
+    date_col = config['date_column']
+    value_cols = config['value_columns']
+    results = {}
+
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        snapshots = SnapshotCache(snapshot_dir, 1 << 40)
+
+        def cold_load():
+            snapshots.invalidate()
+            DataProcessor(file_path, snapshot_cache=snapshots).load_data()
+        results['load_data_cold'] = measure(cold_load, repeat)
+
+        DataProcessor(file_path, snapshot_cache=snapshots).load_data()
+        results['load_data_snapshot'] = measure(
+            lambda: DataProcessor(file_path, snapshot_cache=snapshots).load_data(), repeat
+        )
+        processor = DataProcessor(file_path, snapshot_cache=snapshots)
+        processor.load_data()
+
+    raw = read_workbook_sheets(file_path, SHEET_CONFIG, [BENCHMARK_SHEET])[BENCHMARK_SHEET]
+    results['preprocess_sheet'] = measure(lambda: processor._preprocess_sheet(raw.copy(), BENCHMARK_SHEET), repeat)
+    results['filter_by_date'] = measure(lambda: processor.filter_by_date(*FILTER_WINDOW), repeat)
+
+    df = processor.sheets_data[BENCHMARK_SHEET]
+    results['analyze_trends'] = measure(lambda: analyze_trends(df, date_col, value_cols), repeat)
+    results['generate_summary_stats'] = measure(lambda: generate_summary_stats(df, value_cols), repeat)
+
+    trends = analyze_trends(df, date_col, value_cols)[value_cols[0]]
+    results['create_trend_plot'] = measure(lambda: create_trend_plot(trends, value_cols[0]), repeat)
+    daily = analyze_trends(df, date_col, value_cols, granularity='day')[value_cols[0]]
+    results['create_trend_plot_daily'] = measure(lambda: create_trend_plot(daily, value_cols[0], 'day'), repeat)
+    results['create_distribution_plot'] = measure(lambda: create_distribution_plot(df, value_cols[0]), repeat)
+    results['create_distribution_plot_log'] = measure(
+        lambda: create_distribution_plot(df, value_cols[0], log_scale=True, clip_outliers=True), repeat
+    )
+    return results
+
+def environment() -> Dict[str, str]:
+    """Interpreter and library versions the results were recorded with"""
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__
+    }
+
+def compare(results: Dict, baseline: Dict, threshold: float,
+            min_seconds: float = MIN_REGRESSION_SECONDS) -> List[Dict]:
+    """Benchmarks whose best time or peak memory grew by more than threshold over the baseline"""
+    regressions = []
+    for size, benchmarks in results['results'].items():
+        for name, current in benchmarks.items():
+            previous = baseline.get('results', {}).get(size, {}).get(name)
+            if previous is None:
+                continue
+            for metric in ('seconds_best', 'peak_bytes'):
+                if metric == 'seconds_best' and current[metric] - previous[metric] < min_seconds:
+                    continue
+                if previous[metric] > 0 and current[metric] > previous[metric] * (1 + threshold):
+                    regressions.append({
+                        'size': size,
+                        'benchmark': name,
+                        'metric': metric,
+                        'baseline': previous[metric],
+                        'current': current[metric],
+                        'ratio': current[metric] / previous[metric]
+                    })
+    return regressions
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000], help='Rows per sheet to benchmark')
+    parser.add_argument('--repeat', type=int, default=3, help='Repetitions per benchmark')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the synthetic workbooks')
+    parser.add_argument('--workdir', default=os.path.join(tempfile.gettempdir(), 'tracker_benchmarks'),
+                        help='Directory holding generated workbooks')
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    parser.add_argument('--baseline', help='Compare against results previously written with --output')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Relative slowdown flagged as a regression')
+    parser.add_argument('--min-seconds', type=float, default=MIN_REGRESSION_SECONDS,
+                        help='Absolute slowdown below which timings are never flagged')
+    args = parser.parse_args(argv)
+
+    # The synthetic dirty cells are reported on every load; keep the output to the results
+    logging.basicConfig(level=logging.ERROR)
+    warnings.simplefilter('ignore', UserWarning)
+
+    os.makedirs(args.workdir, exist_ok=True)
+    results = {
+        'format': RESULTS_FORMAT_VERSION,
+        'recorded_at': datetime.now().isoformat(timespec='seconds'),
+        'seed': args.seed,
+        'environment': environment(),
+        'results': {}
+    }
+    for rows in args.sizes:
+        size_results = run_size(workbook_for(rows, args.seed, args.workdir), args.repeat)
+        results['results'][str(rows)] = size_results
+        for name, metrics in size_results.items():
+            print(f"{rows:>8} rows  {name:<30} best {metrics['seconds_best']:9.4f}s  "
+                  f"peak {metrics['peak_bytes'] / 1e6:9.1f} MB")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.threshold, args.min_seconds)
+        for regression in regressions:
+            print(f"REGRESSION {regression['size']} rows {regression['benchmark']} {regression['metric']}: "
+                  f"{regression['baseline']:.4g} -> {regression['current']:.4g} ({regression['ratio']:.2f}x)")
+        if regressions:
+            return 1
+        print(f"No regressions over {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""Synthetic order tracker workbooks matching SHEET_CONFIG, for benchmarking
+
+Usage:
+    python benchmarks/synthetic_workbook.py tracker_100k.xlsx --rows 100000 --seed 0
+"""
+import argparse
+import os
+import sys
+from datetime import datetime
+from typing import Dict, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+from config import SHEET_CONFIG
+from workbook_loader import sheet_columns
+
+AED_PER_USD = 3.6725
+PARTNER_COUNT = 150
+PDC_STATUSES = ['Received', 'Pending', 'Not Required', 'Cleared', None]
+START_DATE = datetime(2021, 1, 1)
+DAYS_SPANNED = 3 * 365
+DIRTY_DATES = ['TBD', 'n/a', '31/02/2023', '?']
+DIRTY_VALUES = ['TBD', 'n/a', '-', 'see email']
+ID_PREFIXES = {
+    'Reference': 'REF', 'SO#': 'SO', 'SO': 'SO', 'OrderID': 'ORD', 'Invoice#': 'INV', 'AutodeskOrder#': 'ADSK'
+}
+
+def _partners(rng: np.random.Generator, rows: int) -> np.ndarray:
+    """Partner names with a long-tailed (Zipf-like) distribution over PARTNER_COUNT resellers"""
+    names = np.array([f"Partner {i:03d} LLC" for i in range(PARTNER_COUNT)], dtype=object)
+    weights = 1.0 / np.arange(1, PARTNER_COUNT + 1)
+    return names[rng.choice(PARTNER_COUNT, size=rows, p=weights / weights.sum())]
+
+def _identifiers(prefix: str, rows: int, offset: int = 0) -> np.ndarray:
+    """Unique sequential order identifiers such as SO0001234"""
+    return np.array([f"{prefix}{offset + i:07d}" for i in range(rows)], dtype=object)
+
+def generate_sheet(sheet_name: str, rows: int, seed: int = 0, dirty_fraction: float = 0.01) -> pd.DataFrame:
+    """One sheet of synthetic orders with every configured column and a share of dirty cells"""
+    rng = np.random.default_rng([seed, list(SHEET_CONFIG).index(sheet_name)])
+    config = SHEET_CONFIG[sheet_name]
+
+    received = pd.Timestamp(START_DATE) + pd.to_timedelta(rng.integers(0, DAYS_SPANNED * 24 * 60, rows), unit='min')
+    value_usd = rng.lognormal(mean=7.5, sigma=1.2, size=rows).round(2)
+    columns = {
+        config['date_column']: received.to_pydatetime().astype(object),
+        'Value$': value_usd.astype(object),
+        'ValueinAED': (value_usd * AED_PER_USD).round(2).astype(object),
+        'Partner': _partners(rng, rows),
+        'PDCstatus': np.array(PDC_STATUSES, dtype=object)[rng.integers(0, len(PDC_STATUSES), rows)],
+    }
+    for col in config['key_columns']:
+        if col in ID_PREFIXES:
+            columns[col] = _identifiers(ID_PREFIXES[col], rows, int(rng.integers(0, 10 ** 6)))
+        elif col not in columns:
+            columns[col] = np.array([f"Customer {i}" for i in rng.integers(0, max(rows // 4, 1), rows)], dtype=object)
+
+    # Dirty cells: free text in date and value columns, plus blanks
+    dirty = int(rows * dirty_fraction)
+    if dirty:
+        date_col = config['date_column']
+        positions = rng.choice(rows, size=dirty, replace=False)
+        columns[date_col][positions] = np.array(DIRTY_DATES + [None], dtype=object)[rng.integers(0, len(DIRTY_DATES) + 1, dirty)]
+        for col in config['value_columns']:
+            positions = rng.choice(rows, size=dirty, replace=False)
+            columns[col][positions] = np.array(DIRTY_VALUES + [None], dtype=object)[rng.integers(0, len(DIRTY_VALUES) + 1, dirty)]
+
+    return pd.DataFrame(columns, columns=sheet_columns(config))
+
+def write_workbook(file_path: str, rows: int, seed: int = 0, dirty_fraction: float = 0.01,
+                   sheet_rows: Optional[Dict[str, int]] = None) -> str:
+    """Write a workbook with every configured sheet, streaming rows through openpyxl's write-only mode"""
+    workbook = Workbook(write_only=True)
+    for sheet_name in SHEET_CONFIG:
+        df = generate_sheet(sheet_name, (sheet_rows or {}).get(sheet_name, rows), seed, dirty_fraction)
+        worksheet = workbook.create_sheet(sheet_name)
+        worksheet.append(list(df.columns))
+        for record in df.itertuples(index=False, name=None):
+            worksheet.append(record)
+    workbook.save(file_path)
+    return file_path
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('file_path', help='Workbook to write')
+    parser.add_argument('--rows', type=int, default=10000, help='Rows per sheet')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    parser.add_argument('--dirty-fraction', type=float, default=0.01, help='Share of dirty cells per column')
+    args = parser.parse_args(argv)
+
+    write_workbook(args.file_path, args.rows, args.seed, args.dirty_fraction)
+    print(f"Wrote {args.rows} rows per sheet to {args.file_path}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,20 +1,113 @@
 """Cache management functionality"""
-import streamlit as st
-from typing import Any, Optional
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
+from config import CACHE_CONFIG
+from profiling import span
+
+def _freeze(value: Any) -> Hashable:
+    """Turn filter parameters (lists, dicts, sets) into a hashable key component"""
+    if isinstance(value, dict):
+        return tuple(sorted(((key, _freeze(item)) for key, item in value.items()), key=repr))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted((_freeze(item) for item in value), key=repr))
+    return value
+
+def estimate_size(value: Any) -> int:
+    """Approximate memory held by a cached value, in bytes"""
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(usage, pd.Series) else usage)
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    if hasattr(value, 'to_plotly_json'):
+        return estimate_size(value.to_plotly_json())
+    if hasattr(value, '__dict__') and not isinstance(value, type):
+        # Result objects (dataclasses, indexes) are as large as the frames and arrays they hold
+        return sys.getsizeof(value) + estimate_size(vars(value))
+    return sys.getsizeof(value)
 
 class CacheManager:
-    @st.cache_data(ttl=3600)  # Cache for 1 hour
-    def cache_dataframe(self, df: pd.DataFrame, sheet_name: str) -> pd.DataFrame:
-        """Cache DataFrame with TTL"""
-        return df.copy()
-    
-    @st.cache_data(ttl=3600)
-    def cache_analysis(self, analysis_type: str, data: Any) -> Any:
-        """Cache analysis results"""
-        return data
-    
+    def __init__(self, memory_budget_bytes: Optional[int] = None):
+        self.memory_budget_bytes = memory_budget_bytes or CACHE_CONFIG['memory_budget_bytes']
+        self._entries: 'OrderedDict[Tuple, Tuple[Any, int]]' = OrderedDict()
+        self._lock = threading.RLock()
+        self._current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        # Front ends register their own caches here (e.g. st.cache_data.clear), keeping this module UI-free
+        self._clear_hooks: List[Callable[[], None]] = []
+
+    def add_clear_hook(self, hook: Callable[[], None]) -> None:
+        """Call hook whenever the cache is cleared; registering the same hook twice is a no-op"""
+        with self._lock:
+            if hook not in self._clear_hooks:
+                self._clear_hooks.append(hook)
+
+    def memoize(self, analysis: str, compute: Callable[[], Any], sheet: Optional[str] = None,
+                column: Optional[str] = None, params: Any = None, version: Optional[str] = None) -> Any:
+        """Return a cached analysis result, calling compute only on a miss"""
+        key = (analysis, sheet, column, _freeze(params), version)
+        with span(f"cache:{analysis}", sheet=sheet, column=column) as handle:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    handle.set(hit=True)
+                    return self._entries[key][0]
+                self.misses += 1
+            handle.set(hit=False)
+
+            result = compute()
+            self._store(key, result)
+            return result
+
+    def _store(self, key: Tuple, value: Any) -> None:
+        """Insert a result and evict least recently used entries over the memory budget"""
+        size = estimate_size(value)
+        if size > self.memory_budget_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._current_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self._current_bytes += size
+            while self._current_bytes > self.memory_budget_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._current_bytes -= evicted_size
+
+    def invalidate(self, version: Optional[str]) -> None:
+        """Drop every cached analysis computed against a data version"""
+        with self._lock:
+            for key in [key for key in self._entries if key[-1] == version]:
+                self._current_bytes -= self._entries.pop(key)[1]
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current memory use"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'bytes': self._current_bytes,
+                'budget_bytes': self.memory_budget_bytes
+            }
+
     def clear_cache(self) -> None:
         """Clear all cached data"""
-        st.cache_data.clear()
\ No newline at end of file
+        with self._lock:
+            self._entries.clear()
+            self._current_bytes = 0
+            hooks = list(self._clear_hooks)
+        for hook in hooks:
+            hook()
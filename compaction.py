@@ -0,0 +1,81 @@
+"""Compact in-memory representation for loaded sheets"""
+import sys
+import pandas as pd
+from typing import Dict, List, Optional
+from profiling import traced
+
+# Object columns with at most this share of distinct values become categoricals
+CATEGORY_MAX_RATIO = 0.5
+
+def frame_memory_bytes(df: pd.DataFrame) -> int:
+    """Deep memory footprint of a frame, including Python string objects"""
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+def _as_text(value):
+    """Render identifiers read as numbers (12345.0) the way they appear in the workbook"""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return sys.intern(value if isinstance(value, str) else str(value))
+
+def _compact_object(values: pd.Series) -> pd.Series:
+    """Normalize a text column to interned strings, as a categorical when cardinality is low"""
+    non_null = values.notna()
+    text = values.copy()
+    text[non_null] = values[non_null].map(_as_text)
+    if len(values) and text.nunique(dropna=True) <= CATEGORY_MAX_RATIO * len(values):
+        return text.astype('category')
+    return text
+
+def _compact_numeric(values: pd.Series) -> pd.Series:
+    """Downcast integers, and floats holding only whole numbers, to the smallest integer type"""
+    if pd.api.types.is_integer_dtype(values):
+        return pd.to_numeric(values, downcast='integer')
+    # float64 is kept for fractional values: float32 sums would lose cents
+    if pd.api.types.is_float_dtype(values) and values.notna().all():
+        downcast = pd.to_numeric(values, downcast='integer')
+        if pd.api.types.is_integer_dtype(downcast):
+            return downcast
+    return values
+
+@traced()
+def compact_frame(df: pd.DataFrame, exact_columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Convert low-cardinality text to categoricals, intern identifiers and downcast numerics losslessly"""
+    exact_columns = exact_columns or []
+    columns: Dict[str, pd.Series] = {}
+    for col in df.columns:
+        values = df[col]
+        if col in exact_columns and pd.api.types.is_numeric_dtype(values):
+            # Money columns stay float64: products and squares of int8/int16 values silently wrap
+            columns[col] = values.astype('float64')
+        elif pd.api.types.is_object_dtype(values):
+            columns[col] = _compact_object(values)
+        elif pd.api.types.is_bool_dtype(values) or pd.api.types.is_datetime64_any_dtype(values):
+            columns[col] = values
+        elif pd.api.types.is_numeric_dtype(values):
+            columns[col] = _compact_numeric(values)
+        else:
+            columns[col] = values
+    return pd.DataFrame(columns, index=df.index)
+
+def concat_compacted(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate compacted frames, unifying categories so categoricals stay categorical"""
+    frames = [df for df in frames if df is not None]
+    for col in frames[0].columns:
+        dtypes = [df[col].dtype for df in frames if col in df.columns]
+        if not any(isinstance(dtype, pd.CategoricalDtype) for dtype in dtypes):
+            continue
+        categories = pd.Index([])
+        for df in frames:
+            if col in df.columns:
+                values = df[col]
+                uniques = values.cat.categories if isinstance(values.dtype, pd.CategoricalDtype) else values.dropna().unique()
+                categories = categories.append(pd.Index(uniques))
+        categories = categories.unique()
+        try:
+            # Categoricals sort by category order, so keep it lexical like a freshly compacted column
+            categories = categories.sort_values()
+        except TypeError:
+            pass
+        dtype = pd.CategoricalDtype(categories)
+        frames = [df.astype({col: dtype}) if col in df.columns else df for df in frames]
+    return pd.concat(frames)
@@ -1,4 +1,5 @@
 """Configuration settings for the dashboard"""
+from typing import Any, Dict
 
 THEME_COLORS = {
     'primary': '#2E7D32',
@@ -7,7 +8,10 @@ THEME_COLORS = {
     'accent': '#4CAF50'
 }
 
-SHEET_CONFIG = {
+# A single workbook, or a directory or glob of workbooks (e.g. monthly copies) loaded together
+WORKBOOK_PATH = "Copy of Autodesk Order Tracker(1).xlsx"
+
+SHEET_CONFIG: Dict[str, Dict[str, Any]] = {
     'Manual Orders Not Invoiced': {
         'date_column': 'ReceivedDate',
         'value_columns': ['Value$', 'ValueinAED'],
@@ -34,6 +38,69 @@ SHEET_CONFIG = {
     }
 }
 
+SNAPSHOT_CONFIG: Dict[str, Any] = {
+    'enabled': True,
+    'directory': '.snapshot_cache',
+    'max_bytes': 512 * 1024 * 1024
+}
+
+CACHE_CONFIG: Dict[str, Any] = {
+    'memory_budget_bytes': 256 * 1024 * 1024
+}
+
+TABLE_CONFIG: Dict[str, Any] = {
+    'page_size': 100,
+    'csv_chunk_rows': 50000
+}
+
+REFRESH_CONFIG: Dict[str, Any] = {
+    'poll_interval_seconds': 5.0,
+    'schedule_interval_seconds': None
+}
+
+RECONCILIATION_CONFIG: Dict[str, Any] = {
+    # Each pending sheet flows into an invoiced sheet; keys are tried in order to match an order
+    'pipelines': {
+        'Online': {
+            'pending': 'Online Orders Not Invoiced',
+            'invoiced': 'Online-Invoiced orders',
+            'keys': ['OrderID', 'SO'],
+            'invoiced_date_column': None
+        },
+        'Manual': {
+            'pending': 'Manual Orders Not Invoiced',
+            'invoiced': 'Manual Orders-Invoiced',
+            'keys': ['Reference', 'SO#'],
+            'invoiced_date_column': None
+        }
+    },
+    'stuck_after_days': 30
+}
+
+PROFILING_CONFIG: Dict[str, Any] = {
+    # Append the spans of every profiled rerun to this JSON-lines file; None to disable
+    'export_path': None
+}
+
+TREND_CONFIG: Dict[str, Any] = {
+    # Resampling alias, moving-average window in periods and legend label of each granularity
+    'granularities': {
+        'day': {'freq': 'D', 'window': 7, 'label': 'Daily'},
+        'week': {'freq': 'W', 'window': 4, 'label': 'Weekly'},
+        'month': {'freq': 'M', 'window': 3, 'label': 'Monthly'}
+    },
+    # Traces longer than this are drawn with WebGL
+    'webgl_threshold': 500,
+    # Traces are downsampled to at most this many points, preserving their shape
+    'max_points': 1500
+}
+
+ORDER_LOOKUP_CONFIG: Dict[str, Any] = {
+    # Key columns holding order identifiers; names and descriptions are left to the table search
+    'identifier_columns': ['SO#', 'SO', 'OrderID', 'Invoice#', 'Reference', 'AutodeskOrder#'],
+    'max_results': 50
+}
+
 CSS_STYLES = """
 <style>
     .reportview-container { background: #f0f2f6 }
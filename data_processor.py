@@ -1,82 +1,293 @@
 """Data processing and analysis functionality"""
+import dataclasses
+import numpy as np
 import pandas as pd
+import io
 import logging
+import os
+import uuid
 from typing import Dict, List, Optional, Tuple
-from datetime import datetime
-import concurrent.futures
-from config import SHEET_CONFIG
-from data_validator import DataValidator
+from datetime import date, datetime
+from config import ORDER_LOOKUP_CONFIG, SHEET_CONFIG, TABLE_CONFIG
+from compaction import compact_frame, concat_compacted, frame_memory_bytes
+from data_validator import CoercionReport, DataValidator
+from filter_index import SheetFilterIndex
+from order_index import OrderKeyIndex
+from profiling import traced
+from rollup import RollupCube, searchsorted_range
 from cache_manager import CacheManager
+from snapshot_cache import SnapshotCache, workbook_key
+from workbook_loader import read_workbook_sheets, sheet_fingerprints
 
 logger = logging.getLogger(__name__)
 
+def row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """Content hash per raw row; repeated identical rows get distinct hashes by occurrence"""
+    # A column read as int in one version and float in the next must not change every row's hash
+    numeric = {col: 'float64' for col in df.columns
+               if pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col])}
+    hashes = pd.util.hash_pandas_object(df.astype(numeric), index=False).to_numpy()
+    occurrence = pd.Series(hashes).groupby(hashes).cumcount().to_numpy(dtype=np.uint64)
+    return pd.util.hash_array(hashes ^ (occurrence * np.uint64(0x9E3779B97F4A7C15)))
+
 class DataProcessor:
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, snapshot_cache: Optional[SnapshotCache] = None,
+                 cache_manager: Optional[CacheManager] = None):
         self.file_path = file_path
         self.sheets_data: Dict[str, pd.DataFrame] = {}
+        self._date_keys: Dict[str, np.ndarray] = {}
+        self.rollups: Dict[str, RollupCube] = {}
+        self.filter_indexes: Dict[str, SheetFilterIndex] = {}
+        self.order_indexes: Dict[str, OrderKeyIndex] = {}
+        self.data_version: Optional[str] = None
+        self.loaded_at: Optional[datetime] = None
+        self.source_modified_at: Optional[datetime] = None
+        self.validation_reports: Dict[str, Dict[str, CoercionReport]] = {}
+        self.memory_footprint: Dict[str, Dict[str, int]] = {}
+        self.sheet_fingerprints: Dict[str, str] = {}
+        self._raw_hashes: Dict[str, np.ndarray] = {}
+        self._row_hashes: Dict[str, np.ndarray] = {}
         self.validator = DataValidator()
-        self.cache_manager = CacheManager()
+        self.cache_manager = cache_manager if cache_manager is not None else CacheManager()
+        self.snapshot_cache = snapshot_cache if snapshot_cache is not None else SnapshotCache.from_config()
 
-    def load_data(self) -> Tuple[bool, str]:
-        """Load all sheets in parallel using ThreadPoolExecutor"""
+    @traced()
+    def load_data(self, baseline: Optional['DataProcessor'] = None) -> Tuple[bool, str]:
+        """Load all configured sheets from a snapshot, or the workbook reusing what is unchanged in baseline"""
+        version = self._workbook_key()
+        snapshot_key = version if self.snapshot_cache is not None else None
+        if snapshot_key is not None and self._load_snapshot(snapshot_key):
+            self._set_data_version(snapshot_key)
+            return True, ""
+        
+        self.sheet_fingerprints = sheet_fingerprints(self.file_path, list(SHEET_CONFIG))
+        changed = []
+        for sheet_name in SHEET_CONFIG:
+            if baseline is not None and self._sheet_unchanged(sheet_name, baseline):
+                self._adopt_sheet(sheet_name, baseline)
+            else:
+                changed.append(sheet_name)
+        
         try:
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                futures = {
-                    executor.submit(self._load_sheet, sheet_name): sheet_name 
-                    for sheet_name in SHEET_CONFIG.keys()
-                }
-                
-                success = True
-                error_message = ""
-                
-                for future in concurrent.futures.as_completed(futures):
-                    sheet_name = futures[future]
-                    try:
-                        df = future.result()
-                        if df is not None:
-                            self.sheets_data[sheet_name] = self.cache_manager.cache_dataframe(df, sheet_name)
-                    except Exception as e:
-                        success = False
-                        error_message = f"Error loading sheet {sheet_name}: {str(e)}"
-                        logger.error(error_message)
-                
-                return success, error_message
-                
+            raw_sheets = read_workbook_sheets(self.file_path, SHEET_CONFIG, changed) if changed else {}
         except Exception as e:
             error_message = f"Error loading data: {str(e)}"
             logger.error(error_message)
             return False, error_message
+        
+        success = True
+        error_message = ""
+        
+        for sheet_name, raw_df in raw_sheets.items():
+            try:
+                hashes = row_hashes(raw_df)
+                if baseline is not None and sheet_name in baseline._raw_hashes and sheet_name in baseline._row_hashes:
+                    self._merge_sheet(sheet_name, raw_df, hashes, baseline)
+                else:
+                    df = self._load_sheet(sheet_name, raw_df)
+                    if df is not None:
+                        self.set_sheet_data(sheet_name, df, row_hashes=hashes[df.index.to_numpy()])
+                        self._raw_hashes[sheet_name] = hashes
+            except Exception as e:
+                success = False
+                error_message = f"Error loading sheet {sheet_name}: {str(e)}"
+                logger.error(error_message)
+        
+        if success and snapshot_key is not None:
+            self._store_snapshot(snapshot_key)
+        
+        self._set_data_version(version or uuid.uuid4().hex)
+        return success, error_message
 
-    def _load_sheet(self, sheet_name: str) -> Optional[pd.DataFrame]:
-        """Load and validate a single sheet"""
+    def _load_snapshot(self, snapshot_key: str) -> bool:
+        """Restore frames, row hashes and sheet fingerprints from a snapshot"""
+        if self.snapshot_cache is None:
+            return False
+        frames = self.snapshot_cache.load(snapshot_key)
+        if frames is None:
+            return False
+        arrays, metadata = self.snapshot_cache.load_extras(snapshot_key)
+        positions = metadata.get('hash_arrays', {})
+        for sheet_name, df in frames.items():
+            position = positions.get(sheet_name)
+            self.set_sheet_data(sheet_name, df, row_hashes=arrays.get(f"rows_{position}"))
+            if f"raw_{position}" in arrays:
+                self._raw_hashes[sheet_name] = arrays[f"raw_{position}"]
+            # Snapshots hold compacted frames; the pre-compaction size is recorded alongside them
+            footprint = frame_memory_bytes(self.sheets_data[sheet_name])
+            before = metadata.get('memory_footprint', {}).get(sheet_name, {}).get('before', footprint)
+            self.memory_footprint[sheet_name] = {'before': before, 'after': footprint}
+        self.sheet_fingerprints = metadata.get('sheet_fingerprints', {})
+        return True
+
+    def _store_snapshot(self, snapshot_key: str) -> None:
+        """Persist frames together with the hashes an incremental reload diffs against"""
+        if self.snapshot_cache is None:
+            return
+        arrays = {}
+        positions = {}
+        for position, sheet_name in enumerate(self.sheets_data):
+            if sheet_name in self._raw_hashes and sheet_name in self._row_hashes:
+                arrays[f"raw_{position}"] = self._raw_hashes[sheet_name]
+                arrays[f"rows_{position}"] = self._row_hashes[sheet_name]
+                positions[sheet_name] = position
+        metadata = {'sheet_fingerprints': self.sheet_fingerprints, 'hash_arrays': positions,
+                    'memory_footprint': self.memory_footprint}
+        self.snapshot_cache.store(snapshot_key, self.sheets_data, arrays=arrays, metadata=metadata)
+
+    def _sheet_unchanged(self, sheet_name: str, baseline: Optional['DataProcessor']) -> bool:
+        """Whether a sheet's fingerprint matches the one baseline was loaded from"""
+        if baseline is None or sheet_name not in baseline.sheets_data:
+            return False
+        fingerprint = self.sheet_fingerprints.get(sheet_name)
+        return fingerprint is not None and baseline.sheet_fingerprints.get(sheet_name) == fingerprint
+
+    def _adopt_sheet(self, sheet_name: str, baseline: 'DataProcessor') -> None:
+        """Share a sheet's immutable frame, aggregates and indexes with baseline instead of rebuilding them"""
+        self.sheets_data[sheet_name] = baseline.sheets_data[sheet_name]
+        self._date_keys[sheet_name] = baseline._date_keys[sheet_name]
+        self.rollups[sheet_name] = baseline.rollups[sheet_name]
+        self.filter_indexes[sheet_name] = baseline.filter_indexes[sheet_name]
+        self.order_indexes[sheet_name] = baseline.order_indexes[sheet_name]
+        for attribute in ('validation_reports', 'memory_footprint', '_raw_hashes', '_row_hashes'):
+            if sheet_name in getattr(baseline, attribute):
+                getattr(self, attribute)[sheet_name] = getattr(baseline, attribute)[sheet_name]
+
+    @traced()
+    def _merge_sheet(self, sheet_name: str, raw_df: pd.DataFrame, hashes: np.ndarray,
+                     baseline: 'DataProcessor') -> None:
+        """Preprocess only new or modified rows and merge them into baseline's frame and rollup"""
+        # A row edited under the same key columns hashes differently, so it shows up as removed plus added
+        added_mask = ~np.isin(hashes, baseline._raw_hashes[sheet_name])
+        keep_mask = np.isin(baseline._row_hashes[sheet_name], hashes)
+        if not added_mask.any() and keep_mask.all():
+            self._adopt_sheet(sheet_name, baseline)
+            self._raw_hashes[sheet_name] = hashes
+            self.validation_reports[sheet_name] = self._merge_reports(sheet_name, baseline, hashes, added_mask, {})
+            return
+        
+        previous = baseline.sheets_data[sheet_name]
+        parts = [previous[keep_mask]]
+        part_hashes = [baseline._row_hashes[sheet_name][keep_mask]]
+        added = None
+        delta_reports: Dict[str, CoercionReport] = {}
+        delta_before = 0
+        if added_mask.any():
+            added = self._load_sheet(sheet_name, raw_df[added_mask].copy())
+            if added is None:
+                raise ValueError("new rows could not be preprocessed")
+            parts.append(added)
+            part_hashes.append(hashes[added.index.to_numpy()])
+            delta_reports = self.validation_reports[sheet_name]
+            delta_before = self.memory_footprint[sheet_name]['before']
+        
+        removed = previous[~keep_mask]
+        merged = concat_compacted(parts)
+        rollup = baseline.rollups[sheet_name].apply_delta(added, removed)
+        self.set_sheet_data(sheet_name, merged, row_hashes=np.concatenate(part_hashes), rollup=rollup)
+        self._raw_hashes[sheet_name] = hashes
+        self.validation_reports[sheet_name] = self._merge_reports(sheet_name, baseline, hashes, added_mask,
+                                                                  delta_reports)
+        
+        # The uncompacted size of the kept rows is estimated as their share of the baseline's
+        footprint = frame_memory_bytes(self.sheets_data[sheet_name])
+        baseline_before = baseline.memory_footprint.get(sheet_name, {}).get('before', 0)
+        kept_before = int(baseline_before * keep_mask.sum() / max(len(previous), 1))
+        self.memory_footprint[sheet_name] = {'before': kept_before + delta_before, 'after': footprint}
+        logger.info(f"Incremental reload of {sheet_name}: {len(added) if added is not None else 0} rows added, "
+                    f"{len(removed)} removed, {int(keep_mask.sum())} reused")
+
+    def _merge_reports(self, sheet_name: str, baseline: 'DataProcessor', hashes: np.ndarray,
+                       added_mask: np.ndarray, delta_reports: Dict[str, CoercionReport]) -> Dict[str, CoercionReport]:
+        """Whole-sheet coercion reports from baseline's and the added rows', in the new raw row positions"""
+        previous = baseline.validation_reports.get(sheet_name, {})
+        # Row hashes are unique within a sheet, so they carry baseline's invalid cells to their new positions
+        new_positions = pd.Index(hashes)
+        baseline_hashes = baseline._raw_hashes[sheet_name]
+        added_positions = np.flatnonzero(added_mask)
+        reports = {}
+        for col in list(previous) + [col for col in delta_reports if col not in previous]:
+            old, new = previous.get(col), delta_reports.get(col)
+            kept = np.empty(0, dtype=np.int64)
+            if old is not None:
+                kept = new_positions.get_indexer(baseline_hashes[old.invalid_positions])
+                kept = kept[kept >= 0]
+            added = added_positions[new.invalid_positions] if new is not None else np.empty(0, dtype=np.int64)
+            positions = np.sort(np.concatenate([kept, added]))
+            # A column without a delta report is one of baseline's
+            reports[col] = dataclasses.replace(new if new is not None else previous[col], total=len(hashes),
+                                               invalid_count=len(positions), invalid_positions=positions)
+        return reports
+
+    def _workbook_key(self) -> Optional[str]:
+        """Fingerprint the workbook to version the loaded data and key its snapshot"""
+        try:
+            return workbook_key(self.file_path)
+        except OSError as e:
+            logger.warning(f"Unable to fingerprint {self.file_path}: {e}")
+            return None
+
+    def _set_data_version(self, version: str) -> None:
+        """Record the loaded data version and drop analyses cached for the previous one"""
+        previous = self.data_version
+        self.data_version = version
+        self.loaded_at = datetime.now()
+        try:
+            self.source_modified_at = datetime.fromtimestamp(os.path.getmtime(self.file_path))
+        except OSError:
+            self.source_modified_at = None
+        if previous is not None and previous != version:
+            self.cache_manager.invalidate(previous)
+
+    def release(self) -> None:
+        """Drop the loaded frames and indexes so a retired version can be freed"""
+        self.sheets_data = {}
+        self._date_keys = {}
+        self.rollups = {}
+        self.filter_indexes = {}
+        self.order_indexes = {}
+        self._raw_hashes = {}
+        self._row_hashes = {}
+
+    @traced()
+    def _load_sheet(self, sheet_name: str, df: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """Validate and preprocess a single raw sheet"""
         try:
-            df = pd.read_excel(self.file_path, sheet_name=sheet_name)
-            
             # Validate sheet structure
             config = SHEET_CONFIG[sheet_name]
             if not self.validator.validate_required_columns(df, [config['date_column']] + config['value_columns']):
                 logger.error(f"Missing required columns in {sheet_name}")
                 return None
                 
-            return self._preprocess_sheet(df, sheet_name)
+            df = self._preprocess_sheet(df, sheet_name)
+            before = frame_memory_bytes(df)
+            df = compact_frame(df, exact_columns=config['value_columns'])
+            self.memory_footprint[sheet_name] = {'before': before, 'after': frame_memory_bytes(df)}
+            return df
         except Exception as e:
             logger.error(f"Failed to load sheet {sheet_name}: {e}")
             return None
 
+    @traced()
     def _preprocess_sheet(self, df: pd.DataFrame, sheet_name: str) -> pd.DataFrame:
         """Preprocess sheet data with validation and cleaning"""
         config = SHEET_CONFIG[sheet_name]
         
-        # Validate and convert date column
+        # Validate and convert each critical column in a single coercion pass
         date_col = config['date_column']
-        if self.validator.validate_date_column(df, date_col):
-            df[date_col] = pd.to_datetime(df[date_col], errors='coerce')
+        converted, report = self.validator.coerce_date_column(df, date_col, config.get('date_format'))
+        coerced = {date_col: (converted, report)}
+        coerced.update(self.validator.coerce_numeric_columns(df, config['value_columns']))
         
-        # Validate and convert numeric columns
-        numeric_validation = self.validator.validate_numeric_columns(df, config['value_columns'])
-        for col, is_valid in numeric_validation.items():
-            if is_valid:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
+        reports = {}
+        for col, (converted, report) in coerced.items():
+            if converted is not None:
+                df[col] = converted
+            if report.invalid_count:
+                logger.warning(f"{report.invalid_count} invalid values in {sheet_name}.{col} "
+                               f"(first rows: {report.invalid_positions[:5].tolist()})")
+            reports[col] = report
+        self.validation_reports[sheet_name] = reports
         
         # Drop rows with missing critical data
         critical_columns = [date_col] + config['value_columns']
@@ -84,14 +295,149 @@ class DataProcessor:
         
         return df
 
-    def filter_by_date(self, start_date: datetime, end_date: datetime) -> None:
-        """Apply date filter to all sheets"""
-        for sheet_name, df in self.sheets_data.items():
-            date_col = SHEET_CONFIG[sheet_name]['date_column']
-            mask = (df[date_col].dt.date >= start_date.date()) & (df[date_col].dt.date <= end_date.date())
-            filtered_df = df[mask]
-            self.sheets_data[sheet_name] = self.cache_manager.cache_dataframe(filtered_df, f"{sheet_name}_filtered")
-
-    def get_sheet_data(self, sheet_name: str) -> Optional[pd.DataFrame]:
-        """Safely retrieve sheet data"""
-        return self.sheets_data.get(sheet_name)
\ No newline at end of file
+    @traced()
+    def set_sheet_data(self, sheet_name: str, df: pd.DataFrame, row_hashes: Optional[np.ndarray] = None,
+                       rollup: Optional[RollupCube] = None) -> None:
+        """Store a sheet as an immutable master frame sorted on its date column"""
+        date_col = SHEET_CONFIG[sheet_name]['date_column']
+        dates = df[date_col]
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            dates = pd.to_datetime(dates, errors='coerce')
+        
+        keys = dates.to_numpy(dtype='datetime64[ns]')
+        if not dates.is_monotonic_increasing:
+            # Stable sort keeps the workbook order for orders received on the same day
+            order = np.argsort(keys, kind='stable')
+            df = df.take(order)
+            keys = keys[order]
+            if row_hashes is not None:
+                row_hashes = row_hashes[order]
+        
+        df = df.reset_index(drop=True)
+        self.sheets_data[sheet_name] = df
+        self._date_keys[sheet_name] = keys
+        if row_hashes is not None:
+            self._row_hashes[sheet_name] = row_hashes
+        else:
+            self._row_hashes.pop(sheet_name, None)
+        self.rollups[sheet_name] = rollup if rollup is not None else RollupCube.build(
+            df, date_col, SHEET_CONFIG[sheet_name]['value_columns'], SHEET_CONFIG[sheet_name]['filter_columns']
+        )
+        self.filter_indexes[sheet_name] = SheetFilterIndex(df, SHEET_CONFIG[sheet_name]['filter_columns'])
+        self.order_indexes[sheet_name] = OrderKeyIndex(df, [
+            col for col in SHEET_CONFIG[sheet_name]['key_columns'] if col in ORDER_LOOKUP_CONFIG['identifier_columns']
+        ])
+
+    def date_range_positions(self, sheet_name: str, start_date: Optional[date] = None,
+                             end_date: Optional[date] = None) -> Tuple[int, int]:
+        """Binary search the sorted date column for the rows within [start_date, end_date]"""
+        return searchsorted_range(self._date_keys[sheet_name], start_date, end_date)
+
+    def memory_report(self) -> pd.DataFrame:
+        """Per-sheet memory footprint before and after compaction, in bytes"""
+        report = pd.DataFrame.from_dict(self.memory_footprint, orient='index', columns=['before', 'after'])
+        report['saved'] = report['before'] - report['after']
+        return report
+
+    def get_rollup(self, sheet_name: str) -> Optional[RollupCube]:
+        """Retrieve the daily rollup cube built for a sheet at load time"""
+        return self.rollups.get(sheet_name)
+
+    def get_filter_index(self, sheet_name: str) -> Optional[SheetFilterIndex]:
+        """Retrieve the categorical filter index built for a sheet at load time"""
+        return self.filter_indexes.get(sheet_name)
+
+    @traced()
+    def find_orders(self, query: str, prefix: bool = True, limit: Optional[int] = None) -> Dict[str, pd.DataFrame]:
+        """Rows of every sheet whose order identifiers match the query, with the column each matched on"""
+        max_results: int = ORDER_LOOKUP_CONFIG['max_results'] if limit is None else limit
+        results = {}
+        for sheet_name, index in self.order_indexes.items():
+            found = index.search(query, prefix=prefix, limit=max_results)
+            if found.empty:
+                continue
+            rows = self.sheets_data[sheet_name].take(found['position'].to_numpy())
+            results[sheet_name] = rows.reset_index(drop=True).assign(matched_on=found['matched_on'].to_numpy())
+        return results
+
+    def select_positions(self, sheet_name: str, start_date: Optional[date] = None, end_date: Optional[date] = None,
+                         filters: Optional[Dict[str, List]] = None) -> np.ndarray:
+        """Row positions within the date range that match every categorical filter"""
+        start, stop = self.date_range_positions(sheet_name, start_date, end_date)
+        positions = self.filter_indexes[sheet_name].select(filters, start, stop)
+        return np.arange(start, stop) if positions is None else positions
+
+    def filter_by_date(self, start_date: Optional[date], end_date: Optional[date]) -> Dict[str, pd.DataFrame]:
+        """Return date-filtered views of all sheets without modifying the loaded data"""
+        return {
+            sheet_name: self.get_sheet_data(sheet_name, start_date, end_date)
+            for sheet_name in self.sheets_data
+        }
+
+    def get_sheet_data(self, sheet_name: str, start_date: Optional[date] = None, end_date: Optional[date] = None,
+                       filters: Optional[Dict[str, List]] = None) -> Optional[pd.DataFrame]:
+        """Safely retrieve sheet data, optionally narrowed to a date range and categorical filters"""
+        df = self.sheets_data.get(sheet_name)
+        if df is None:
+            return df
+        if filters and any(filters.values()):
+            return df.take(self.select_positions(sheet_name, start_date, end_date, filters))
+        if start_date is None and end_date is None:
+            return df
+        start, stop = self.date_range_positions(sheet_name, start_date, end_date)
+        return df.iloc[start:stop]
+
+    def table_positions(self, sheet_name: str, start_date: Optional[date] = None, end_date: Optional[date] = None,
+                        search: Optional[str] = None, sort_by: Optional[str] = None,
+                        ascending: bool = True, filters: Optional[Dict[str, List]] = None) -> np.ndarray:
+        """Row positions matching a date range, categorical filters and key-column search, in display order"""
+        def compute() -> np.ndarray:
+            df = self.sheets_data[sheet_name]
+            positions = self.select_positions(sheet_name, start_date, end_date, filters)
+            
+            if search:
+                mask = np.zeros(len(positions), dtype=bool)
+                for col in SHEET_CONFIG[sheet_name]['key_columns']:
+                    if col in df.columns:
+                        values = df[col].take(positions)
+                        mask |= (values.notna() & values.astype(str).str.contains(search, case=False, regex=False)).to_numpy()
+                positions = positions[mask]
+            
+            if sort_by and sort_by in df.columns:
+                values = df[sort_by].take(positions).reset_index(drop=True)
+                order = values.sort_values(ascending=ascending, kind='mergesort', na_position='last').index.to_numpy()
+                positions = positions[order]
+            
+            return positions
+        
+        return self.cache_manager.memoize(
+            "table_positions",
+            compute,
+            sheet=sheet_name,
+            params=(start_date, end_date, search, sort_by, ascending, filters),
+            version=self.data_version
+        )
+
+    @traced()
+    def query_table(self, sheet_name: str, start_date: Optional[date] = None, end_date: Optional[date] = None,
+                    search: Optional[str] = None, sort_by: Optional[str] = None, ascending: bool = True,
+                    filters: Optional[Dict[str, List]] = None, page: int = 0,
+                    page_size: int = TABLE_CONFIG['page_size']) -> Tuple[pd.DataFrame, int]:
+        """Return one page of the searched and sorted sheet plus the total matching row count"""
+        positions = self.table_positions(sheet_name, start_date, end_date, search, sort_by, ascending, filters)
+        page_positions = positions[page * page_size:(page + 1) * page_size]
+        return self.sheets_data[sheet_name].take(page_positions), len(positions)
+
+    @traced()
+    def export_table_csv(self, sheet_name: str, start_date: Optional[date] = None, end_date: Optional[date] = None,
+                         search: Optional[str] = None, sort_by: Optional[str] = None,
+                         ascending: bool = True, filters: Optional[Dict[str, List]] = None) -> bytes:
+        """Write the full searched and sorted result as CSV, one chunk of rows at a time"""
+        positions = self.table_positions(sheet_name, start_date, end_date, search, sort_by, ascending, filters)
+        df = self.sheets_data[sheet_name]
+        chunk_rows = TABLE_CONFIG['csv_chunk_rows']
+        buffer = io.StringIO()
+        df.head(0).to_csv(buffer, index=False)
+        for offset in range(0, len(positions), chunk_rows):
+            df.take(positions[offset:offset + chunk_rows]).to_csv(buffer, index=False, header=False)
+        return buffer.getvalue().encode('utf-8')
@@ -1,40 +1,130 @@
 """Data validation functionality"""
+import numpy as np
 import pandas as pd
-from typing import List, Dict, Optional
+from dataclasses import dataclass, field
+from typing import List, Dict, Optional, Tuple
 import logging
+from profiling import traced
+
+try:
+    from pandas._libs.tslibs.parsing import guess_datetime_format
+except ImportError:  # pragma: no cover - depends on the installed pandas
+    guess_datetime_format = None
 
 logger = logging.getLogger(__name__)
 
+FORMAT_SAMPLE_SIZE = 20
+
+@dataclass
+class CoercionReport:
+    """Outcome of coercing one column: which non-empty cells failed to convert"""
+    column: str
+    total: int
+    invalid_count: int = 0
+    invalid_positions: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    missing: bool = False
+    date_format: Optional[str] = None
+
+    @property
+    def is_valid(self) -> bool:
+        return not self.missing and self.invalid_count == 0
+
+def _failed_positions(original: pd.Series, converted: pd.Series) -> np.ndarray:
+    """Positions of cells that had a value before coercion but not after"""
+    return np.flatnonzero(converted.isna().to_numpy() & original.notna().to_numpy())
+
+def _infer_date_format(values: pd.Series) -> Optional[str]:
+    """Guess a strftime format from a sample of string dates, verified against the sample"""
+    if guess_datetime_format is None:
+        return None
+    sample = values.dropna().head(FORMAT_SAMPLE_SIZE)
+    if sample.empty:
+        return None
+    date_format = guess_datetime_format(str(sample.iloc[0]))
+    if date_format is None:
+        return None
+    # A format that fails on most of the sample would push every cell onto the slow path
+    if pd.to_datetime(sample, format=date_format, errors='coerce').isna().mean() > 0.5:
+        return None
+    return date_format
+
 class DataValidator:
+    @staticmethod
+    @traced('DataValidator.coerce_date_column')
+    def coerce_date_column(df: pd.DataFrame, date_column: str,
+                           date_format: Optional[str] = None) -> Tuple[Optional[pd.Series], CoercionReport]:
+        """Convert a date column in one vectorized pass and report the cells that failed"""
+        if date_column not in df.columns:
+            return None, CoercionReport(date_column, total=len(df), missing=True)
+
+        values = df[date_column]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            return values, CoercionReport(date_column, total=len(values))
+
+        if pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+            # Bare numbers would silently become nanosecond epoch offsets
+            converted = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+        else:
+            inferred = pd.api.types.infer_dtype(values, skipna=True)
+            if inferred in ('mixed', 'mixed-integer', 'mixed-integer-float', 'integer', 'floating'):
+                is_number = values.map(lambda v: isinstance(v, (int, float, np.number)))
+                values = values.where(~is_number.astype(bool))
+
+            if inferred == 'string':
+                date_format = date_format or _infer_date_format(values)
+            else:
+                date_format = None
+
+            if date_format:
+                converted = pd.to_datetime(values, format=date_format, errors='coerce')
+                # Only cells that do not match the dominant format fall back to the flexible parser
+                retry = converted.isna() & values.notna()
+                if retry.any():
+                    converted[retry] = pd.to_datetime(values[retry], errors='coerce')
+            else:
+                converted = pd.to_datetime(values, errors='coerce')
+
+        positions = _failed_positions(df[date_column], converted)
+        report = CoercionReport(date_column, total=len(converted), invalid_count=len(positions),
+                                invalid_positions=positions, date_format=date_format)
+        return converted, report
+
+    @staticmethod
+    @traced('DataValidator.coerce_numeric_columns')
+    def coerce_numeric_columns(df: pd.DataFrame,
+                               numeric_columns: List[str]) -> Dict[str, Tuple[Optional[pd.Series], CoercionReport]]:
+        """Convert numeric columns in one vectorized pass each and report the cells that failed"""
+        results = {}
+        for col in numeric_columns:
+            if col not in df.columns:
+                results[col] = (None, CoercionReport(col, total=len(df), missing=True))
+                continue
+            values = df[col]
+            converted = values if pd.api.types.is_numeric_dtype(values) else pd.to_numeric(values, errors='coerce')
+            positions = _failed_positions(values, converted)
+            results[col] = (converted, CoercionReport(col, total=len(converted), invalid_count=len(positions),
+                                                      invalid_positions=positions))
+        return results
+
     @staticmethod
     def validate_date_column(df: pd.DataFrame, date_column: str) -> bool:
         """Validate date column format and values"""
-        try:
-            if date_column not in df.columns:
-                return False
-            pd.to_datetime(df[date_column], errors='raise')
-            return True
-        except Exception as e:
-            logger.error(f"Date validation error: {e}")
-            return False
+        _, report = DataValidator.coerce_date_column(df, date_column)
+        if report.invalid_count:
+            logger.error(f"Date validation error: {report.invalid_count} invalid values in {date_column}")
+        return report.is_valid
 
     @staticmethod
     def validate_numeric_columns(df: pd.DataFrame, numeric_columns: List[str]) -> Dict[str, bool]:
         """Validate numeric columns"""
         results = {}
-        for col in numeric_columns:
-            try:
-                if col not in df.columns:
-                    results[col] = False
-                    continue
-                pd.to_numeric(df[col], errors='raise')
-                results[col] = True
-            except Exception as e:
-                logger.error(f"Numeric validation error in column {col}: {e}")
-                results[col] = False
+        for col, (_, report) in DataValidator.coerce_numeric_columns(df, numeric_columns).items():
+            if report.invalid_count:
+                logger.error(f"Numeric validation error in column {col}: {report.invalid_count} invalid values")
+            results[col] = report.is_valid
         return results
 
     @staticmethod
     def validate_required_columns(df: pd.DataFrame, required_columns: List[str]) -> bool:
         """Validate presence of required columns"""
-        return all(col in df.columns for col in required_columns)
\ No newline at end of file
+        return all(col in df.columns for col in required_columns)
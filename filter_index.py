@@ -0,0 +1,66 @@
+"""Categorical row indexes for multi-select filtering"""
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+
+class ColumnIndex:
+    """Category codes for one column plus the sorted row positions of every value"""
+
+    def __init__(self, values: pd.Series):
+        codes, uniques = pd.factorize(values)
+        self.codes = codes
+        self.categories = list(uniques)
+        self._lookup = {value: code for code, value in enumerate(self.categories)}
+
+        # Group positions by code; a stable sort keeps positions ascending within each value
+        order = np.argsort(codes, kind='stable')
+        missing = int((codes < 0).sum())
+        self._order = order[missing:]
+        counts = np.bincount(codes[codes >= 0], minlength=len(self.categories))
+        self._bounds = np.concatenate([[0], np.cumsum(counts)])
+
+    def options(self) -> List:
+        """Distinct non-null values, in display order"""
+        return sorted(self.categories, key=str)
+
+    def positions(self, value) -> np.ndarray:
+        """Sorted row positions holding a value"""
+        code = self._lookup.get(value)
+        if code is None:
+            return np.empty(0, dtype=np.int64)
+        return self._order[self._bounds[code]:self._bounds[code + 1]]
+
+    def select(self, values: List) -> np.ndarray:
+        """Sorted row positions holding any of the values"""
+        parts = [self.positions(value) for value in values]
+        if len(parts) == 1:
+            return parts[0]
+        return np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+
+class SheetFilterIndex:
+    """Column indexes for a sheet's filter columns, built once at load time"""
+
+    def __init__(self, df: pd.DataFrame, columns: List[str]):
+        self.num_rows = len(df)
+        self.columns = {col: ColumnIndex(df[col]) for col in columns if col in df.columns}
+
+    def options(self, column: str) -> List:
+        """Selectable values of a filter column"""
+        index = self.columns.get(column)
+        return index.options() if index is not None else []
+
+    def select(self, filters: Optional[Dict[str, List]], start: int = 0,
+               stop: Optional[int] = None) -> Optional[np.ndarray]:
+        """Intersect the selected values of every filter within [start, stop), or None if no filter is active"""
+        active = {col: values for col, values in (filters or {}).items() if values and col in self.columns}
+        if not active:
+            return None
+
+        stop = self.num_rows if stop is None else stop
+        result: Optional[np.ndarray] = None
+        for col, values in active.items():
+            positions = self.columns[col].select(values)
+            # Position arrays are sorted, so the date range is a binary-searched slice
+            positions = positions[positions.searchsorted(start):positions.searchsorted(stop)]
+            result = positions if result is None else np.intersect1d(result, positions, assume_unique=True)
+        return result
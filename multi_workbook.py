@@ -0,0 +1,147 @@
+"""Ingestion of several tracker workbooks (e.g. monthly copies) into one deduplicated dataset"""
+import concurrent.futures
+import hashlib
+import logging
+import os
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from config import SHEET_CONFIG
+from compaction import concat_compacted, frame_memory_bytes
+from data_processor import DataProcessor
+from profiling import traced
+from snapshot_cache import workbook_key
+from workbook_loader import is_workbook_collection, read_workbook_sheets, resolve_workbooks
+
+logger = logging.getLogger(__name__)
+
+def load_workbook_frames(file_path: str) -> Tuple[str, Dict[str, pd.DataFrame], Dict]:
+    """Preprocessed, compacted frames of one workbook plus its timing; runs in a worker process"""
+    started = time.perf_counter()
+    processor = DataProcessor(file_path)
+    snapshot_cache = processor.snapshot_cache
+    key = processor._workbook_key()
+    frames = snapshot_cache.load(key) if snapshot_cache is not None and key is not None else None
+    source = 'snapshot'
+    if frames is None:
+        source = 'workbook'
+        frames = {}
+        for sheet_name, raw_df in read_workbook_sheets(file_path, SHEET_CONFIG).items():
+            df = processor._load_sheet(sheet_name, raw_df)
+            if df is not None:
+                frames[sheet_name] = df
+        # Monthly copies never change, so later runs only pay for the snapshot read
+        if snapshot_cache is not None and key is not None:
+            snapshot_cache.store(key, frames)
+    timing = {
+        'seconds': time.perf_counter() - started,
+        'rows': sum(len(df) for df in frames.values()),
+        'invalid_cells': sum(report.invalid_count for reports in processor.validation_reports.values()
+                             for report in reports.values()),
+        'source': source
+    }
+    return file_path, frames, timing
+
+def latest_file_wins(df: pd.DataFrame, ranks: np.ndarray, key_columns: List[str]) -> pd.DataFrame:
+    """Keep, for every key, only the rows from the newest file holding it; repeats within a file are kept"""
+    key_columns = [col for col in key_columns if col in df.columns]
+    if not key_columns or df.empty:
+        return df
+    keys = df[key_columns]
+    key_hashes = pd.util.hash_pandas_object(keys, index=False).to_numpy()
+    newest = pd.Series(ranks).groupby(key_hashes).transform('max').to_numpy()
+    # Rows without any key value cannot be matched across files
+    keep = (ranks == newest) | keys.isna().all(axis=1).to_numpy()
+    return df[keep]
+
+class MultiWorkbookProcessor(DataProcessor):
+    """A DataProcessor over every workbook in a directory or glob, parsed in parallel"""
+
+    def __init__(self, source: str, workers: Optional[int] = None, **kwargs):
+        super().__init__(source, **kwargs)
+        self.workers = workers
+        self.file_paths: List[str] = []
+        self.file_timings: Dict[str, Dict] = {}
+
+    def _workbook_key(self) -> Optional[str]:
+        """Version the dataset on the fingerprints of every workbook, in resolution order"""
+        try:
+            keys = [workbook_key(path) for path in resolve_workbooks(self.file_path)]
+        except OSError as e:
+            logger.warning(f"Unable to fingerprint {self.file_path}: {e}")
+            return None
+        return hashlib.sha256('\n'.join(keys).encode('utf-8')).hexdigest()[:32] if keys else None
+
+    def _set_data_version(self, version: str) -> None:
+        """Record the version, dating the data by its newest workbook"""
+        super()._set_data_version(version)
+        mtimes = [os.path.getmtime(path) for path in self.file_paths if os.path.exists(path)]
+        self.source_modified_at = datetime.fromtimestamp(max(mtimes)) if mtimes else None
+
+    def _parse_all(self) -> List[Tuple[str, Dict[str, pd.DataFrame], Dict]]:
+        """Parse every workbook, across a process pool when there is more than one"""
+        if len(self.file_paths) == 1 or self.workers == 1:
+            return [load_workbook_frames(path) for path in self.file_paths]
+        # Excel parsing is CPU-bound pure Python, so only processes scale with cores
+        with concurrent.futures.ProcessPoolExecutor(max_workers=self.workers) as executor:
+            return list(executor.map(load_workbook_frames, self.file_paths))
+
+    @traced()
+    def load_data(self, baseline: Optional[DataProcessor] = None) -> Tuple[bool, str]:
+        """Load every workbook, concatenate each sheet and deduplicate its key columns, latest file winning"""
+        self.file_paths = resolve_workbooks(self.file_path)
+        if not self.file_paths:
+            error_message = f"No workbooks found in {self.file_path}"
+            logger.error(error_message)
+            return False, error_message
+        version = self._workbook_key()
+
+        try:
+            parsed = self._parse_all()
+        except Exception as e:
+            error_message = f"Error loading data: {str(e)}"
+            logger.error(error_message)
+            return False, error_message
+
+        success = True
+        error_message = ""
+        for file_path, _, timing in parsed:
+            self.file_timings[file_path] = timing
+            logger.info(f"Loaded {os.path.basename(file_path)} from {timing['source']}: "
+                        f"{timing['rows']} rows in {timing['seconds']:.2f}s")
+
+        for sheet_name in SHEET_CONFIG:
+            parts = [(rank, frames[sheet_name]) for rank, (_, frames, _) in enumerate(parsed) if sheet_name in frames]
+            if not parts:
+                continue
+            try:
+                merged = concat_compacted([df for _, df in parts])
+                ranks = np.concatenate([np.full(len(df), rank) for rank, df in parts])
+                deduplicated = latest_file_wins(merged, ranks, SHEET_CONFIG[sheet_name]['key_columns'])
+                self.set_sheet_data(sheet_name, deduplicated)
+                # Workers return compacted frames, so the pre-compaction size is not known here
+                footprint = frame_memory_bytes(self.sheets_data[sheet_name])
+                self.memory_footprint[sheet_name] = {'before': footprint, 'after': footprint}
+                logger.info(f"{sheet_name}: {len(merged)} rows from {len(parts)} workbooks, "
+                            f"{len(merged) - len(deduplicated)} superseded by newer files")
+            except Exception as e:
+                success = False
+                error_message = f"Error loading sheet {sheet_name}: {str(e)}"
+                logger.error(error_message)
+
+        self._set_data_version(version or uuid.uuid4().hex)
+        return success, error_message
+
+    def timing_report(self) -> pd.DataFrame:
+        """Per-workbook load time, row and invalid cell counts, and whether it came from a snapshot"""
+        return pd.DataFrame.from_dict(self.file_timings, orient='index',
+                                      columns=['seconds', 'rows', 'invalid_cells', 'source'])
+
+def create_processor(source: str, **kwargs) -> DataProcessor:
+    """A processor for a single workbook, or for every workbook in a directory or glob"""
+    if is_workbook_collection(source):
+        return MultiWorkbookProcessor(source, **kwargs)
+    return DataProcessor(source, **kwargs)
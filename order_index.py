@@ -0,0 +1,88 @@
+"""Order identifier index: hash lookups and prefix search over every sheet's identifier columns"""
+import numpy as np
+import pandas as pd
+from typing import List, Tuple
+
+def normalize_identifiers(values: pd.Series) -> np.ndarray:
+    """Identifiers as stripped upper-case strings, with '' where a value is missing"""
+    codes, uniques = pd.factorize(values)
+    uniques = pd.Series(uniques)
+    # Order numbers read as floats (12345.0) must still match the digits an operator types
+    if pd.api.types.is_float_dtype(uniques) and (uniques % 1 == 0).all():
+        uniques = uniques.astype('int64')
+    elif uniques.dtype == object:
+        values = uniques.to_numpy(dtype=object)
+        whole = np.array([isinstance(value, float) and value.is_integer() for value in values], dtype=bool)
+        values[whole] = [int(value) for value in values[whole]]
+        uniques = pd.Series(values, dtype=object)
+    text = np.append(uniques.astype(str).str.strip().str.upper().to_numpy(dtype=object), '')
+    return text[codes]
+
+def normalize_query(query: str) -> str:
+    """Normalize a typed identifier the same way the indexed values are"""
+    return query.strip().upper()
+
+class OrderKeyIndex:
+    """Sorted identifier values of one sheet, each with the row position and column it came from"""
+
+    def __init__(self, df: pd.DataFrame, columns: List[str]):
+        self.columns = [col for col in columns if col in df.columns]
+        keys, positions, column_codes = [], [], []
+        for code, col in enumerate(self.columns):
+            values = normalize_identifiers(df[col])
+            present = np.flatnonzero(values != '')
+            keys.append(values[present])
+            positions.append(present)
+            column_codes.append(np.full(len(present), code, dtype=np.int8))
+        keys = np.concatenate(keys) if keys else np.empty(0, dtype=object)
+
+        # Sorted keys serve prefix ranges by binary search; a stable sort keeps rows ascending per key
+        order = np.argsort(keys, kind='stable')
+        self.keys = keys[order]
+        self.positions = np.concatenate(positions)[order] if positions else np.empty(0, dtype=np.int64)
+        self.column_codes = np.concatenate(column_codes)[order] if column_codes else np.empty(0, dtype=np.int8)
+
+        # Hash index from each distinct key to its run in the sorted arrays for O(1) exact lookups
+        uniques, starts = np.unique(self.keys, return_index=True)
+        self._lookup = {key: code for code, key in enumerate(uniques)}
+        self._bounds = np.append(starts, len(self.keys))
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def exact_range(self, key: str) -> Tuple[int, int]:
+        """Run of the sorted arrays holding exactly a normalized key"""
+        code = self._lookup.get(key)
+        if code is None:
+            return 0, 0
+        return int(self._bounds[code]), int(self._bounds[code + 1])
+
+    def prefix_range(self, prefix: str) -> Tuple[int, int]:
+        """Run of the sorted arrays holding every key that starts with a normalized prefix"""
+        if not prefix:
+            return 0, 0
+        # Every key with the prefix sorts below the prefix with its last character incremented
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        return (int(np.searchsorted(self.keys, prefix, side='left')),
+                int(np.searchsorted(self.keys, upper, side='left')))
+
+    def matches(self, start: int, stop: int) -> pd.DataFrame:
+        """Row positions, matched column and key of a run of the sorted arrays, one row per position"""
+        found = pd.DataFrame({
+            'position': self.positions[start:stop],
+            'matched_on': np.asarray(self.columns, dtype=object)[self.column_codes[start:stop]],
+            'key': self.keys[start:stop]
+        })
+        # A row holding the same prefix in several columns is returned once
+        return found.drop_duplicates('position')
+
+    def search(self, query: str, prefix: bool = True, limit: int = 50) -> pd.DataFrame:
+        """Rows whose identifiers equal the query or, with prefix, start with it; exact matches first"""
+        key = normalize_query(query)
+        start, stop = self.exact_range(key)
+        found = self.matches(start, stop)
+        if prefix and len(found) < limit:
+            start, stop = self.prefix_range(key)
+            found = pd.concat([found, self.matches(start, min(stop, start + limit * len(self.columns)))],
+                              ignore_index=True).drop_duplicates('position')
+        return found.head(limit).reset_index(drop=True)
@@ -0,0 +1,116 @@
+"""Lightweight timing spans around loading, analytics, plotting and cache lookups"""
+import functools
+import json
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import pandas as pd
+
+@dataclass
+class Span:
+    """One timed call: offset from the start of the recording, duration and nesting depth"""
+    name: str
+    start_ms: float
+    duration_ms: float = 0.0
+    depth: int = 0
+    rows: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+class SpanRecorder:
+    """Collects the spans of one rerun, in the order they started"""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+        self._depth = 0
+        self._origin = time.perf_counter()
+
+    def to_frame(self) -> pd.DataFrame:
+        """Spans as a table, with names indented by nesting depth"""
+        return pd.DataFrame([{
+            'span': '  ' * span.depth + span.name,
+            'ms': round(span.duration_ms, 2),
+            'rows': span.rows,
+            'details': ', '.join(f"{key}={value}" for key, value in span.attributes.items() if value is not None)
+        } for span in self.spans], columns=['span', 'ms', 'rows', 'details'])
+
+    def to_jsonl(self, **context) -> str:
+        """One JSON object per span, tagged with the given context (session, data version...)"""
+        return ''.join(json.dumps({**context, **asdict(span)}, default=str) + '\n' for span in self.spans)
+
+    def export_jsonl(self, path: str, **context) -> None:
+        """Append the spans to a JSON-lines file for offline analysis"""
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(self.to_jsonl(**context))
+
+class _SpanHandle:
+    """Lets the code inside a span attach row counts and attributes"""
+    __slots__ = ('span',)
+
+    def __init__(self, span: Optional[Span]):
+        self.span = span
+
+    def set(self, rows: Optional[int] = None, **attributes) -> None:
+        if self.span is None:
+            return
+        if rows is not None:
+            self.span.rows = int(rows)
+        self.span.attributes.update(attributes)
+
+_NO_SPAN = _SpanHandle(None)
+_recorder: ContextVar[Optional[SpanRecorder]] = ContextVar('span_recorder', default=None)
+
+def active_recorder() -> Optional[SpanRecorder]:
+    """The recorder collecting spans in this thread, or None when profiling is off"""
+    return _recorder.get()
+
+@contextmanager
+def recording(recorder: Optional[SpanRecorder] = None) -> Iterator[SpanRecorder]:
+    """Record every span started in this thread for the duration of the block"""
+    recorder = recorder if recorder is not None else SpanRecorder()
+    token = _recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _recorder.reset(token)
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[_SpanHandle]:
+    """Time a block; a no-op when no recorder is active"""
+    recorder = _recorder.get()
+    if recorder is None:
+        yield _NO_SPAN
+        return
+
+    start = time.perf_counter()
+    current = Span(name, (start - recorder._origin) * 1000, depth=recorder._depth, attributes=attributes)
+    recorder.spans.append(current)
+    recorder._depth += 1
+    try:
+        yield _SpanHandle(current)
+    finally:
+        recorder._depth -= 1
+        current.duration_ms = (time.perf_counter() - start) * 1000
+
+def _row_count(args: tuple, kwargs: dict) -> Optional[int]:
+    """Length of the first frame or series passed to a traced call"""
+    for value in list(args) + list(kwargs.values()):
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            return len(value)
+    return None
+
+def traced(name: Optional[str] = None) -> Callable:
+    """Decorate a function to run inside a span recording its input row count"""
+    def decorator(func: Callable) -> Callable:
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _recorder.get() is None:
+                return func(*args, **kwargs)
+            with span(label) as handle:
+                handle.set(rows=_row_count(args, kwargs))
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,162 @@
+"""Cross-sheet order lifecycle reconciliation: pending orders matched to their invoiced rows"""
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Dict, Optional
+from config import RECONCILIATION_CONFIG, SHEET_CONFIG
+from order_index import normalize_identifiers
+from profiling import traced
+
+class KeyIndex:
+    """Hash index from the distinct values of a key column to the first row holding each"""
+
+    def __init__(self, values: pd.Series):
+        codes, uniques = pd.factorize(_key_values(values))
+        self.index = pd.Index(uniques)
+        self.counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        # Reversed assignment leaves the first occurrence of every code in place
+        self.first_position = np.full(len(uniques), -1, dtype=np.int64)
+        positions = np.flatnonzero(codes >= 0)
+        self.first_position[codes[positions][::-1]] = positions[::-1]
+
+    def lookup(self, values: pd.Series) -> np.ndarray:
+        """First row position of each value, or -1 where the value is not indexed"""
+        codes = self.index.get_indexer(_key_values(values))
+        return np.where(codes >= 0, self.first_position[codes], -1)
+
+    def duplicated_values(self) -> pd.Series:
+        """Values held by more than one row, with their row counts"""
+        repeated = self.counts > 1
+        return pd.Series(self.counts[repeated], index=self.index[repeated])
+
+def _key_values(values: pd.Series) -> np.ndarray:
+    """Key values normalized like the order lookup, so 1001, 1001.0 and ' 1001' compare equal across sheets"""
+    result = normalize_identifiers(values)
+    result[result == ''] = None
+    return result
+
+@dataclass
+class PipelineReconciliation:
+    """How the orders of one pending sheet flowed into its invoiced sheet"""
+    name: str
+    pending_sheet: str
+    invoiced_sheet: str
+    matched: pd.DataFrame
+    stuck: pd.DataFrame
+    duplicates: pd.DataFrame
+    counts: Dict[str, int] = field(default_factory=dict)
+    latency: Dict[str, float] = field(default_factory=dict)
+
+def get_key_index(processor, sheet_name: str, column: str) -> Optional[KeyIndex]:
+    """Key index for a sheet column, built once per data version"""
+    df = processor.get_sheet_data(sheet_name)
+    if df is None or column not in df.columns:
+        return None
+    return processor.cache_manager.memoize(
+        "key_index",
+        lambda: KeyIndex(df[column]),
+        sheet=sheet_name,
+        column=column,
+        version=processor.data_version
+    )
+
+def _latency_summary(days: pd.Series) -> Dict[str, float]:
+    """Median, mean, 90th percentile and maximum conversion latency in days"""
+    days = days.dropna()
+    if days.empty:
+        return {}
+    return {
+        'median_days': float(days.median()),
+        'mean_days': float(days.mean()),
+        'p90_days': float(days.quantile(0.9)),
+        'max_days': float(days.max())
+    }
+
+@traced()
+def reconcile_pipeline(processor, name: str, pipeline: Dict, stuck_after_days: int,
+                       as_of: date) -> Optional[PipelineReconciliation]:
+    """Match pending to invoiced orders on each key column in turn, first match winning"""
+    pending = processor.get_sheet_data(pipeline['pending'])
+    invoiced = processor.get_sheet_data(pipeline['invoiced'])
+    if pending is None or invoiced is None:
+        return None
+    date_col = SHEET_CONFIG[pipeline['pending']]['date_column']
+    invoiced_date_col = pipeline.get('invoiced_date_column') or SHEET_CONFIG[pipeline['invoiced']]['date_column']
+
+    # Each key column is one linear pass of hash lookups; later keys only fill rows still unmatched
+    match = np.full(len(pending), -1, dtype=np.int64)
+    matched_on = np.full(len(pending), None, dtype=object)
+    for key in pipeline['keys']:
+        index = get_key_index(processor, pipeline['invoiced'], key)
+        if index is None or key not in pending.columns:
+            continue
+        unmatched = np.flatnonzero(match < 0)
+        found = index.lookup(pending[key].take(unmatched))
+        hits = unmatched[found >= 0]
+        match[hits] = found[found >= 0]
+        matched_on[hits] = key
+
+    is_matched = match >= 0
+    matched_rows = np.flatnonzero(is_matched)
+    received = pending[date_col].take(matched_rows).reset_index(drop=True)
+    invoiced_at = pd.to_datetime(invoiced[invoiced_date_col].take(match[matched_rows])).reset_index(drop=True)
+    key_columns = [key for key in pipeline['keys'] if key in pending.columns]
+    matched = pending[key_columns].take(matched_rows).reset_index(drop=True).assign(
+        matched_on=matched_on[matched_rows],
+        received=received,
+        invoiced=invoiced_at,
+        latency_days=(invoiced_at - received).dt.total_seconds() / 86400
+    )
+
+    # Pending orders with no invoiced row that have waited past the threshold
+    age_days = (pd.Timestamp(as_of) - pending[date_col]).dt.total_seconds() / 86400
+    stuck_mask = ~is_matched & (age_days > stuck_after_days).to_numpy()
+    extra_columns = [col for col in ['Partner', 'PDCstatus'] + SHEET_CONFIG[pipeline['pending']]['value_columns']
+                     if col in pending.columns and col not in key_columns]
+    stuck = pending.loc[stuck_mask, key_columns + [date_col] + extra_columns].assign(
+        age_days=age_days[stuck_mask].round(1)
+    ).sort_values('age_days', ascending=False).reset_index(drop=True)
+
+    duplicates = []
+    for sheet_name in (pipeline['pending'], pipeline['invoiced']):
+        for key in pipeline['keys']:
+            index = get_key_index(processor, sheet_name, key)
+            if index is None:
+                continue
+            repeated = index.duplicated_values()
+            duplicates.append(pd.DataFrame({'sheet': sheet_name, 'key': key, 'value': repeated.index,
+                                            'rows': repeated.to_numpy()}))
+    duplicates = (pd.concat(duplicates, ignore_index=True) if duplicates
+                  else pd.DataFrame(columns=['sheet', 'key', 'value', 'rows']))
+
+    counts = {
+        'pending': len(pending),
+        'invoiced': len(invoiced),
+        'in_both': int(is_matched.sum()),
+        'stuck': len(stuck),
+        'duplicate_keys': len(duplicates)
+    }
+    return PipelineReconciliation(name, pipeline['pending'], pipeline['invoiced'], matched, stuck, duplicates,
+                                  counts, _latency_summary(matched['latency_days']))
+
+def reconcile(processor, stuck_after_days: Optional[int] = None,
+              as_of: Optional[date] = None) -> Dict[str, PipelineReconciliation]:
+    """Reconcile every configured pipeline, cached per data version, threshold and reference date"""
+    stuck_after_days = RECONCILIATION_CONFIG['stuck_after_days'] if stuck_after_days is None else stuck_after_days
+    as_of = as_of or date.today()
+
+    def compute() -> Dict[str, PipelineReconciliation]:
+        results = {}
+        for name, pipeline in RECONCILIATION_CONFIG['pipelines'].items():
+            result = reconcile_pipeline(processor, name, pipeline, stuck_after_days, as_of)
+            if result is not None:
+                results[name] = result
+        return results
+
+    return processor.cache_manager.memoize(
+        "reconciliation",
+        compute,
+        params=(stuck_after_days, as_of),
+        version=processor.data_version
+    )
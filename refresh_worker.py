@@ -0,0 +1,108 @@
+"""Background workbook refresh with file watching"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from config import REFRESH_CONFIG
+from workbook_loader import is_workbook_collection, resolve_workbooks
+
+logger = logging.getLogger(__name__)
+
+def source_signature(file_path: str) -> Optional[Tuple[int, int]]:
+    """Cheap change detector for the workbook, or every workbook in a directory or glob: size and modification time"""
+    try:
+        if is_workbook_collection(file_path):
+            stats = [os.stat(path) for path in resolve_workbooks(file_path)]
+            return sum(stat.st_size for stat in stats) + len(stats), max((stat.st_mtime_ns for stat in stats), default=0)
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+class RefreshWorker:
+    """Watches a workbook and reloads it into a SharedDataStore off the request path"""
+
+    def __init__(self, store, file_path: str, poll_interval: float = REFRESH_CONFIG['poll_interval_seconds'],
+                 schedule_interval: Optional[float] = REFRESH_CONFIG['schedule_interval_seconds']):
+        self.store = store
+        self.file_path = file_path
+        self.poll_interval = poll_interval
+        self.schedule_interval = schedule_interval
+        self.refreshing = False
+        self.last_refresh: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self._loaded_signature = source_signature(file_path)
+        self._pending_signature: Optional[Tuple[int, int]] = None
+        self._next_scheduled = time.monotonic() + schedule_interval if schedule_interval else None
+        self._requested = False
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"refresh-{os.path.basename(file_path)}", daemon=True)
+
+    def start(self) -> 'RefreshWorker':
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout)
+
+    def request_refresh(self) -> None:
+        """Ask for a reload without waiting for it"""
+        self._requested = True
+        self._wake.set()
+
+    def _due(self) -> bool:
+        """Whether a reload is requested, scheduled, or the workbook changed and has settled"""
+        if self._requested:
+            return True
+        if self._next_scheduled is not None and time.monotonic() >= self._next_scheduled:
+            return True
+
+        signature = source_signature(self.file_path)
+        if signature is None or signature == self._loaded_signature:
+            self._pending_signature = None
+            return False
+        # Wait one more poll so a workbook that is still being saved is not read half-written
+        if signature == self._pending_signature:
+            return True
+        self._pending_signature = signature
+        return False
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            if self._stop.is_set() or not self._due():
+                continue
+
+            self._requested = False
+            self._pending_signature = None
+            signature = source_signature(self.file_path)
+            self.refreshing = True
+            try:
+                success, error_message = self.store.refresh(self.file_path)
+                self.last_error = None if success else error_message
+                self.last_refresh = datetime.now()
+                self._loaded_signature = signature
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"Background refresh of {self.file_path} failed: {e}")
+            finally:
+                self.refreshing = False
+                if self.schedule_interval:
+                    self._next_scheduled = time.monotonic() + self.schedule_interval
+
+_workers: Dict[str, RefreshWorker] = {}
+_workers_lock = threading.Lock()
+
+def get_refresh_worker(store, file_path: str) -> RefreshWorker:
+    """The running worker for a workbook, started on first use"""
+    with _workers_lock:
+        worker = _workers.get(file_path)
+        if worker is None:
+            worker = _workers[file_path] = RefreshWorker(store, file_path).start()
+        return worker
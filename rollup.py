@@ -0,0 +1,163 @@
+"""Pre-aggregated daily rollups for summary and trend queries"""
+import numpy as np
+import pandas as pd
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+from config import TREND_CONFIG
+from profiling import traced
+
+SUM_SUFFIX = '__sum'
+COUNT_SUFFIX = '__count'
+SUMSQ_SUFFIX = '__sumsq'
+
+def moving_average_column(granularity: str) -> str:
+    """Name of the moving-average column of a trend table, e.g. 3_month_ma"""
+    return f"{TREND_CONFIG['granularities'][granularity]['window']}_{granularity}_ma"
+
+def add_trend_columns(period_data: pd.DataFrame, granularity: str) -> pd.DataFrame:
+    """Add period-over-period growth and the granularity's moving average of the totals"""
+    period_data['growth_rate'] = period_data['sum'].pct_change() * 100
+    period_data[moving_average_column(granularity)] = period_data['sum'].rolling(
+        window=TREND_CONFIG['granularities'][granularity]['window'], min_periods=1
+    ).mean()
+    return period_data
+
+def searchsorted_range(keys: np.ndarray, start_date: Optional[date] = None,
+                       end_date: Optional[date] = None) -> Tuple[int, int]:
+    """Positions of [start_date, end_date] (whole days, inclusive) in sorted datetime64 keys"""
+    start = 0
+    stop = len(keys)
+    if start_date is not None:
+        start = int(keys.searchsorted(np.datetime64(pd.Timestamp(start_date).normalize()), side='left'))
+    if end_date is not None:
+        end_bound = pd.Timestamp(end_date).normalize() + timedelta(days=1)
+        stop = int(keys.searchsorted(np.datetime64(end_bound), side='left'))
+    return start, max(start, stop)
+
+class RollupCube:
+    """Sum, count and sum of squares per day and dimension combination"""
+
+    def __init__(self, table: pd.DataFrame, date_column: str, value_columns: List[str], dimensions: List[str]):
+        self.table = table
+        self.date_column = date_column
+        self.value_columns = value_columns
+        self.dimensions = dimensions
+        self._days = table['day'].to_numpy(dtype='datetime64[ns]')
+
+    @classmethod
+    @traced('RollupCube.build')
+    def build(cls, df: pd.DataFrame, date_column: str, value_columns: List[str],
+              dimensions: List[str]) -> 'RollupCube':
+        """Aggregate a sheet to one row per day and dimension combination"""
+        value_columns = [col for col in value_columns if col in df.columns]
+        dimensions = [col for col in dimensions if col in df.columns]
+
+        work = pd.DataFrame({'day': pd.to_datetime(df[date_column]).dt.normalize()}, index=df.index)
+        # Grouping on categorical keys drops NaN keys on pandas 1.5 even with dropna=False
+        for dim in dimensions:
+            work[dim] = df[dim].astype(object)
+        for col in value_columns:
+            values = df[col].astype('float64')
+            work[col + SUM_SUFFIX] = values
+            work[col + COUNT_SUFFIX] = values.notna().astype('int64')
+            work[col + SUMSQ_SUFFIX] = values * values
+
+        table = (
+            work.groupby(['day'] + dimensions, dropna=False, sort=True)
+            .sum()
+            .reset_index()
+        )
+        return cls(table, date_column, value_columns, dimensions)
+
+    @traced()
+    def apply_delta(self, added: Optional[pd.DataFrame] = None,
+                    removed: Optional[pd.DataFrame] = None) -> 'RollupCube':
+        """A new cube with rows of added folded in and rows of removed subtracted out"""
+        parts = [self.table]
+        for df, sign in ((added, 1), (removed, -1)):
+            if df is not None and len(df):
+                delta = RollupCube.build(df, self.date_column, self.value_columns, self.dimensions).table
+                measures = [col for col in delta.columns if col != 'day' and col not in self.dimensions]
+                delta[measures] = delta[measures] * sign
+                parts.append(delta)
+        if len(parts) == 1:
+            return self
+
+        # Dimension categories differ between frames, so group on plain values
+        combined = pd.concat(
+            [part.astype({dim: object for dim in self.dimensions}) for part in parts], ignore_index=True
+        )
+        table = (
+            combined.groupby(['day'] + self.dimensions, dropna=False, sort=True)
+            .sum()
+            .reset_index()
+        )
+        counts = table[[col + COUNT_SUFFIX for col in self.value_columns]]
+        table = table[(counts != 0).any(axis=1)].reset_index(drop=True)
+        return RollupCube(table, self.date_column, self.value_columns, self.dimensions)
+
+    def _select(self, start_date: Optional[date], end_date: Optional[date],
+                filters: Optional[Dict[str, List]]) -> pd.DataFrame:
+        """Cube rows within the date range matching every dimension filter"""
+        start, stop = searchsorted_range(self._days, start_date, end_date)
+        selected = self.table.iloc[start:stop]
+        for dim, values in (filters or {}).items():
+            if dim in self.dimensions and values:
+                selected = selected[selected[dim].isin(values)]
+        return selected
+
+    @traced()
+    def summary(self, value_columns: List[str], start_date: Optional[date] = None,
+                end_date: Optional[date] = None, filters: Optional[Dict[str, List]] = None,
+                raw: Optional[pd.DataFrame] = None) -> Dict:
+        """Totals, averages and standard deviations; median, min and max come from the raw slice"""
+        value_columns = [col for col in value_columns if col in self.value_columns]
+        if not value_columns:
+            return {}
+        selected = self._select(start_date, end_date, filters)
+        totals = selected[[col + suffix for col in value_columns
+                           for suffix in (SUM_SUFFIX, COUNT_SUFFIX, SUMSQ_SUFFIX)]].sum()
+
+        raw_stats = None
+        if raw is not None:
+            raw_stats = raw[[col for col in value_columns if col in raw.columns]].agg(['median', 'min', 'max'])
+
+        summary = {}
+        for col in value_columns:
+            total = totals[col + SUM_SUFFIX]
+            count = int(totals[col + COUNT_SUFFIX])
+            sum_sq = totals[col + SUMSQ_SUFFIX]
+            average = total / count if count else np.nan
+            std_dev = np.nan
+            if count > 1:
+                std_dev = np.sqrt(max(sum_sq - total * total / count, 0.0) / (count - 1))
+
+            summary[col] = {'total': total, 'average': average, 'std_dev': std_dev, 'count': count}
+            if raw_stats is not None and col in raw_stats.columns:
+                summary[col].update(raw_stats[col].to_dict())
+        return summary
+
+    @traced()
+    def trends(self, value_columns: List[str], start_date: Optional[date] = None,
+               end_date: Optional[date] = None, filters: Optional[Dict[str, List]] = None,
+               granularity: str = 'month') -> Dict:
+        """Per-period totals, means, growth rates and moving averages at a day, week or month granularity"""
+        value_columns = [col for col in value_columns if col in self.value_columns]
+        if not value_columns:
+            return {}
+        selected = self._select(start_date, end_date, filters)
+        freq = TREND_CONFIG['granularities'][granularity]['freq']
+        periods = selected.groupby(pd.Grouper(key='day', freq=freq))[
+            [col + suffix for col in value_columns for suffix in (SUM_SUFFIX, COUNT_SUFFIX)]
+        ].sum()
+        periods.index.name = self.date_column
+
+        trends = {}
+        for col in value_columns:
+            period_data = pd.DataFrame({
+                'sum': periods[col + SUM_SUFFIX],
+                'mean': periods[col + SUM_SUFFIX] / periods[col + COUNT_SUFFIX],
+                'count': periods[col + COUNT_SUFFIX]
+            })
+            trends[col] = add_trend_columns(period_data, granularity)
+        return trends
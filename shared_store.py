@@ -0,0 +1,124 @@
+"""Process-wide shared store of loaded workbook versions"""
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional, Tuple
+from cache_manager import CacheManager
+from data_processor import DataProcessor
+from multi_workbook import create_processor
+
+logger = logging.getLogger(__name__)
+
+class _Dataset:
+    """One loaded workbook version and the number of reruns currently reading it"""
+
+    def __init__(self, processor: DataProcessor):
+        self.processor = processor
+        self.leases = 0
+        self.retired = False
+
+class SharedDataStore:
+    """Loads each workbook version once and serves the same read-only frames to every session"""
+
+    def __init__(self, cache_manager: Optional[CacheManager] = None,
+                 processor_factory: Callable[..., DataProcessor] = create_processor):
+        self.cache_manager = cache_manager if cache_manager is not None else CacheManager()
+        self.processor_factory = processor_factory
+        self._lock = threading.Lock()
+        self._current: Dict[str, _Dataset] = {}
+        self._load_locks: Dict[str, threading.Lock] = {}
+
+    def _load_lock(self, file_path: str) -> threading.Lock:
+        with self._lock:
+            return self._load_locks.setdefault(file_path, threading.Lock())
+
+    def _load(self, file_path: str, baseline: Optional[DataProcessor] = None) -> Tuple[Optional[DataProcessor], bool, str]:
+        """Build and load a fresh processor that shares this store's analysis cache and unchanged sheets"""
+        processor = self.processor_factory(file_path, cache_manager=self.cache_manager)
+        success, error_message = processor.load_data(baseline=baseline)
+        if not processor.sheets_data:
+            return None, False, error_message or "No sheets could be loaded"
+        return processor, success, error_message
+
+    def is_loaded(self, file_path: str) -> bool:
+        with self._lock:
+            return file_path in self._current
+
+    def current(self, file_path: str) -> Optional[DataProcessor]:
+        """The processor serving the current version, without taking a lease"""
+        with self._lock:
+            dataset = self._current.get(file_path)
+            return dataset.processor if dataset is not None else None
+
+    def ensure_loaded(self, file_path: str) -> Tuple[bool, str]:
+        """Load a workbook on first use; concurrent callers wait for a single loader"""
+        if self.is_loaded(file_path):
+            return True, ""
+        with self._load_lock(file_path):
+            # Another session may have finished the load while we waited
+            if self.is_loaded(file_path):
+                return True, ""
+            processor, success, error_message = self._load(file_path)
+            if processor is not None:
+                with self._lock:
+                    self._current[file_path] = _Dataset(processor)
+            return success, error_message
+
+    def refresh(self, file_path: str) -> Tuple[bool, str]:
+        """Load the workbook again and swap in the new version if it changed"""
+        with self._load_lock(file_path):
+            # Leased versions are never released mid-load, so the current one is a safe baseline
+            with self.lease(file_path) as baseline:
+                processor, success, error_message = self._load(file_path, baseline)
+            if processor is None:
+                return False, error_message
+
+            with self._lock:
+                previous = self._current.get(file_path)
+                if previous is not None and previous.processor.data_version == processor.data_version:
+                    # Unchanged workbook: keep serving the version sessions already hold
+                    return success, error_message
+                self._current[file_path] = _Dataset(processor)
+                if previous is not None:
+                    previous.retired = True
+                    release = previous.leases == 0
+                else:
+                    release = False
+
+            if release and previous is not None:
+                self._release(previous)
+            return success, error_message
+
+    @contextmanager
+    def lease(self, file_path: str) -> Iterator[Optional[DataProcessor]]:
+        """Hold the current version for the duration of a rerun"""
+        with self._lock:
+            dataset = self._current.get(file_path)
+            if dataset is not None:
+                dataset.leases += 1
+        try:
+            yield dataset.processor if dataset is not None else None
+        finally:
+            if dataset is not None:
+                with self._lock:
+                    dataset.leases -= 1
+                    release = dataset.retired and dataset.leases == 0
+                if release:
+                    self._release(dataset)
+
+    def _release(self, dataset: _Dataset) -> None:
+        """Free a retired version and the analyses cached against it"""
+        logger.info(f"Releasing data version {dataset.processor.data_version}")
+        self.cache_manager.invalidate(dataset.processor.data_version)
+        dataset.processor.release()
+
+_default_store: Optional[SharedDataStore] = None
+_default_store_lock = threading.Lock()
+
+def get_shared_store() -> SharedDataStore:
+    """The store shared by every session in this process"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = SharedDataStore()
+        return _default_store
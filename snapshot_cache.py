@@ -0,0 +1,179 @@
+"""Persistent columnar snapshot cache for preprocessed sheets"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Optional, Tuple
+from config import SHEET_CONFIG, SNAPSHOT_CONFIG
+from profiling import traced
+
+try:
+    import pyarrow
+except ImportError:  # pragma: no cover - depends on the installed extras
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT_VERSION = 2
+MANIFEST_NAME = 'manifest.json'
+ARRAYS_NAME = 'arrays.npz'
+
+_missing_engine_logged = False
+
+def config_version(sheet_config: Dict = SHEET_CONFIG) -> str:
+    """Hash of the sheet configuration and snapshot format"""
+    payload = json.dumps({'format': SNAPSHOT_FORMAT_VERSION, 'sheets': sheet_config}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+def file_fingerprint(file_path: str, chunk_size: int = 1 << 20) -> Dict:
+    """Size, modification time and content hash of a file"""
+    stat = os.stat(file_path)
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'content_hash': digest.hexdigest()}
+
+def workbook_key(file_path: str, sheet_config: Dict = SHEET_CONFIG) -> str:
+    """Key a workbook version on its fingerprint and the sheet configuration"""
+    payload = json.dumps({'file': file_fingerprint(file_path), 'config': config_version(sheet_config)}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+class SnapshotCache:
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def from_config(cls) -> Optional['SnapshotCache']:
+        """Build the cache described by SNAPSHOT_CONFIG, or None when disabled"""
+        global _missing_engine_logged
+        if not SNAPSHOT_CONFIG.get('enabled', True):
+            return None
+        if pyarrow is None:
+            # Every store would otherwise fail with an ImportError logged as a warning
+            if not _missing_engine_logged:
+                logger.warning("Snapshot cache disabled: pyarrow is not installed (pip install -r requirements.txt)")
+                _missing_engine_logged = True
+            return None
+        return cls(SNAPSHOT_CONFIG['directory'], SNAPSHOT_CONFIG['max_bytes'])
+
+    def snapshot_key(self, file_path: str, sheet_config: Dict = SHEET_CONFIG) -> str:
+        """Key a snapshot on the workbook fingerprint and the sheet configuration"""
+        return workbook_key(file_path, sheet_config)
+
+    def _snapshot_dir(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    @traced()
+    def load(self, key: str) -> Optional[Dict[str, pd.DataFrame]]:
+        """Load a snapshot, returning None on a miss or a corrupt snapshot"""
+        snapshot_dir = self._snapshot_dir(key)
+        manifest_path = os.path.join(snapshot_dir, MANIFEST_NAME)
+        if not os.path.exists(manifest_path):
+            return None
+
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('key') != key or manifest.get('format') != SNAPSHOT_FORMAT_VERSION:
+                raise ValueError("manifest does not match snapshot key")
+
+            frames = {}
+            for sheet_name, file_name in manifest['sheets'].items():
+                frames[sheet_name] = pd.read_parquet(os.path.join(snapshot_dir, file_name), memory_map=True)
+
+            # Mark as recently used for eviction
+            os.utime(manifest_path)
+            return frames
+        except Exception as e:
+            logger.warning(f"Discarding corrupt snapshot {key}: {e}")
+            self.invalidate(key)
+            return None
+
+    def load_extras(self, key: str) -> Tuple[Dict[str, np.ndarray], Dict]:
+        """Arrays and metadata stored alongside a snapshot's frames, empty when absent"""
+        snapshot_dir = self._snapshot_dir(key)
+        try:
+            with open(os.path.join(snapshot_dir, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+                metadata = json.load(f).get('metadata', {})
+            arrays_path = os.path.join(snapshot_dir, ARRAYS_NAME)
+            arrays = {}
+            if os.path.exists(arrays_path):
+                with np.load(arrays_path, allow_pickle=False) as archive:
+                    arrays = {name: archive[name] for name in archive.files}
+            return arrays, metadata
+        except Exception as e:
+            logger.warning(f"Unable to read snapshot extras {key}: {e}")
+            return {}, {}
+
+    @traced()
+    def store(self, key: str, frames: Dict[str, pd.DataFrame], arrays: Optional[Dict[str, np.ndarray]] = None,
+              metadata: Optional[Dict] = None) -> bool:
+        """Write a snapshot atomically and evict old snapshots over the size cap"""
+        tmp_dir = None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_dir = tempfile.mkdtemp(prefix='.tmp-', dir=self.directory)
+
+            manifest: Dict[str, Any] = {'key': key, 'format': SNAPSHOT_FORMAT_VERSION, 'sheets': {}}
+            for position, (sheet_name, df) in enumerate(frames.items()):
+                file_name = f"sheet_{position}.parquet"
+                df.to_parquet(os.path.join(tmp_dir, file_name), engine='pyarrow')
+                manifest['sheets'][sheet_name] = file_name
+            if arrays:
+                np.savez(os.path.join(tmp_dir, ARRAYS_NAME), **arrays)
+            if metadata:
+                manifest['metadata'] = metadata
+
+            with open(os.path.join(tmp_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+                json.dump(manifest, f)
+
+            snapshot_dir = self._snapshot_dir(key)
+            if os.path.exists(snapshot_dir):
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+            else:
+                os.rename(tmp_dir, snapshot_dir)
+            tmp_dir = None
+
+            self._evict(keep=key)
+            return True
+        except Exception as e:
+            logger.warning(f"Unable to write snapshot {key}: {e}")
+            return False
+        finally:
+            if tmp_dir is not None:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Remove one snapshot, or every snapshot when no key is given"""
+        if key is None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+        else:
+            shutil.rmtree(self._snapshot_dir(key), ignore_errors=True)
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        """Drop least recently used snapshots until the cache fits in max_bytes"""
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            snapshot_dir = os.path.join(self.directory, name)
+            if name.startswith('.') or not os.path.isdir(snapshot_dir):
+                continue
+            size = sum(entry.stat().st_size for entry in os.scandir(snapshot_dir) if entry.is_file())
+            manifest_path = os.path.join(snapshot_dir, MANIFEST_NAME)
+            last_used = os.path.getmtime(manifest_path) if os.path.exists(manifest_path) else 0.0
+            entries.append((last_used, name, size))
+            total += size
+
+        for _, name, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            self.invalidate(name)
+            total -= size
@@ -0,0 +1,130 @@
+"""Tests for analytics functionality"""
+import pytest
+import numpy as np
+import pandas as pd
+from analytics import (
+    analyze_trends,
+    compute_histogram,
+    compute_sheet_analytics,
+    create_distribution_plot,
+    create_trend_plot,
+    downsample_lttb,
+    generate_summary_stats
+)
+from config import TREND_CONFIG
+from rollup import RollupCube
+
+@pytest.fixture
+def sample_df():
+    return pd.DataFrame({
+        'ReceivedDate': pd.to_datetime(['2023-01-05', '2023-01-20', '2023-02-03', '2023-04-11']),
+        'Value$': [100.0, 300.0, 50.0, 250.0],
+        'ValueinAED': [367.0, 1101.0, 183.5, 917.5],
+        'Partner': ['A', 'B', 'A', 'A']
+    })
+
+def test_summary_stats(sample_df):
+    summary = generate_summary_stats(sample_df, ['Value$', 'missing'])
+    
+    assert list(summary) == ['Value$']
+    assert summary['Value$']['total'] == 700
+    assert summary['Value$']['median'] == 175
+    assert summary['Value$']['count'] == 4
+
+def test_missing_value_columns_are_skipped(sample_df):
+    assert generate_summary_stats(sample_df, ['missing']) == {}
+    assert analyze_trends(sample_df, 'ReceivedDate', ['missing']) == {}
+    assert compute_sheet_analytics(sample_df, 'ReceivedDate', ['missing']) == {'summary': {}, 'trends': {}}
+    rollup = RollupCube.build(sample_df, 'ReceivedDate', ['Value$'], ['Partner'])
+    assert compute_sheet_analytics(sample_df, 'ReceivedDate', ['missing'], rollup=rollup) == {'summary': {}, 'trends': {}}
+
+def test_analyze_trends_fills_empty_months(sample_df):
+    trends = analyze_trends(sample_df, 'ReceivedDate', ['Value$'])['Value$']
+    
+    assert list(trends['sum']) == [400, 50, 0, 250]
+    assert list(trends['count']) == [2, 1, 0, 1]
+    assert trends['3_month_ma'].iloc[1] == 225
+
+def test_analyze_trends_weekly_moving_average(sample_df):
+    trends = analyze_trends(sample_df, 'ReceivedDate', ['Value$'], granularity='week')['Value$']
+    
+    assert trends['sum'].sum() == 700
+    assert trends.index.freqstr == 'W-SUN'
+    assert trends['4_week_ma'].iloc[3] == pytest.approx(trends['sum'].iloc[:4].mean())
+
+def test_downsample_lttb_keeps_endpoints_and_peaks():
+    x = np.arange(10000)
+    y = np.sin(x / 500.0)
+    y[4321] = 50.0
+    keep = downsample_lttb(x, y, 200)
+    
+    assert len(keep) == 200
+    assert keep[0] == 0 and keep[-1] == 9999
+    assert np.all(np.diff(keep) > 0)
+    assert 4321 in keep
+    assert downsample_lttb(x[:50], y[:50], 200).tolist() == list(range(50))
+
+def test_long_trend_plot_uses_bounded_webgl_traces(sample_df):
+    days = pd.DataFrame({
+        'ReceivedDate': pd.date_range('2015-01-01', periods=3000, freq='D'),
+        'Value$': np.arange(3000, dtype=float)
+    })
+    trends = analyze_trends(days, 'ReceivedDate', ['Value$'], granularity='day')['Value$']
+    fig = create_trend_plot(trends, 'Value$', granularity='day')
+    
+    assert [trace.type for trace in fig.data] == ['scattergl', 'scattergl']
+    assert all(len(trace.x) == TREND_CONFIG['max_points'] for trace in fig.data)
+    assert fig.data[1].name == '7-Day Moving Average'
+    
+    monthly = analyze_trends(sample_df, 'ReceivedDate', ['Value$'])['Value$']
+    assert [trace.type for trace in create_trend_plot(monthly, 'Value$').data] == ['bar', 'scatter']
+
+def test_compute_sheet_analytics_batches_columns(sample_df):
+    value_columns = ['Value$', 'ValueinAED']
+    analysis = compute_sheet_analytics(sample_df, 'ReceivedDate', value_columns)
+    
+    assert analysis['summary'] == generate_summary_stats(sample_df, value_columns)
+    for col in value_columns:
+        pd.testing.assert_frame_equal(analysis['trends'][col], analyze_trends(sample_df, 'ReceivedDate', [col])[col])
+
+def test_compute_sheet_analytics_from_rollup(sample_df):
+    value_columns = ['Value$', 'ValueinAED']
+    rollup = RollupCube.build(sample_df, 'ReceivedDate', value_columns, ['Partner'])
+    raw = compute_sheet_analytics(sample_df, 'ReceivedDate', value_columns)
+    cubed = compute_sheet_analytics(sample_df, 'ReceivedDate', value_columns, rollup=rollup)
+    
+    for col in value_columns:
+        for stat, value in raw['summary'][col].items():
+            assert cubed['summary'][col][stat] == pytest.approx(value)
+        pd.testing.assert_frame_equal(cubed['trends'][col], raw['trends'][col], check_dtype=False)
+
+def test_compute_sheet_analytics_computes_only_requested_parts(sample_df):
+    rollup = RollupCube.build(sample_df, 'ReceivedDate', ['Value$'], ['Partner'])
+    
+    assert list(compute_sheet_analytics(sample_df, 'ReceivedDate', ['Value$'], parts=('summary',))) == ['summary']
+    assert list(compute_sheet_analytics(sample_df, 'ReceivedDate', ['Value$'], rollup=rollup,
+                                        parts=('trends',))) == ['trends']
+
+def test_compute_histogram_counts_every_value():
+    values = pd.Series([1.0, 2.0, 2.5, 3.0, 1000.0, None])
+    counts, edges = compute_histogram(values, bins=4)
+    
+    assert counts.sum() == 5
+    assert len(edges) == 5
+    assert edges[0] == 1.0 and edges[-1] == 1000.0
+
+def test_compute_histogram_log_scale_and_clipping():
+    values = pd.Series(list(range(1, 101)) + [0, -5])
+    counts, edges = compute_histogram(values, bins=10, log_scale=True, clip_quantiles=(0.1, 0.9))
+    
+    assert counts.sum() == 100
+    assert edges[0] > 1 and edges[-1] < 100
+    assert np.allclose(np.diff(np.log10(edges)), np.log10(edges[1] / edges[0]))
+
+def test_distribution_plot_payload_is_binned():
+    df = pd.DataFrame({'Value$': np.random.default_rng(0).gamma(2.0, 500.0, 50000)})
+    fig = create_distribution_plot(df, 'Value$', bins=30)
+    
+    assert fig.data[0].type == 'bar'
+    assert len(fig.data[0].x) == 30
+    assert sum(fig.data[0].y) == 50000
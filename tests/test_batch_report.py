@@ -0,0 +1,69 @@
+"""Tests for the headless batch report generator"""
+import os
+import subprocess
+import sys
+import pytest
+import pandas as pd
+from datetime import date, datetime
+import config
+from batch_report import build_tasks, generate_reports, parse_window, report_labels, window_label
+
+@pytest.fixture
+def workbook_path(tmp_path, monkeypatch):
+    monkeypatch.setitem(config.SNAPSHOT_CONFIG, 'enabled', False)
+    path = tmp_path / "tracker.xlsx"
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame({
+            'ReceivedDate': [datetime(2023, 1, 5), datetime(2023, 1, 20), datetime(2023, 2, 3)],
+            'Value$': [100, 200, 400],
+            'ValueinAED': [367, 734, 1468],
+            'Reference': ['REF1', 'REF2', 'REF3'],
+            'Partner': ['P1', 'P2', 'P1']
+        }).to_excel(writer, sheet_name='Manual Orders Not Invoiced', index=False)
+    return str(path)
+
+def test_parse_window():
+    assert parse_window('2023-01-01:2023-03-31') == (date(2023, 1, 1), date(2023, 3, 31))
+    assert parse_window(':2023-03-31') == (None, date(2023, 3, 31))
+    assert window_label(parse_window(':')) == 'all'
+
+def test_build_tasks_fans_out_per_sheet_and_column():
+    tasks = build_tasks(['a.xlsx', 'b.xlsx'], [(None, None), (date(2023, 1, 1), None)])
+    per_workbook_window = sum(len(sheet['value_columns']) for sheet in config.SHEET_CONFIG.values())
+    assert len(tasks) == 4 * per_workbook_window
+
+def test_generate_reports_writes_csv_and_html(workbook_path, tmp_path):
+    windows = [(None, None), (date(2023, 1, 1), date(2023, 1, 31))]
+    written = generate_reports([workbook_path], windows, str(tmp_path / "out"), workers=1)
+    
+    assert len(written) == 8
+    summary = pd.read_csv(tmp_path / "out" / "tracker_2023-01-01_2023-01-31" / "summary.csv")
+    assert summary.set_index('value_column').loc['Value$', 'total'] == 300
+    trends = pd.read_csv(tmp_path / "out" / "tracker_all" / "trends.csv")
+    assert list(trends[trends['value_column'] == 'Value$']['sum']) == [300, 400]
+    html = (tmp_path / "out" / "tracker_all" / "report.html").read_text()
+    assert 'Manual Orders Not Invoiced' in html and 'plotly' in html
+
+def test_report_labels_disambiguate_same_named_workbooks():
+    labels = report_labels(['jan/Tracker.xlsx', 'feb/Tracker.xlsx', 'x/feb/Tracker.xlsx', 'other.xlsx'])
+    
+    assert labels['other.xlsx'] == 'other'
+    assert labels['jan/Tracker.xlsx'] == 'tracker_jan'
+    assert labels['feb/Tracker.xlsx'] == 'tracker_feb_2'
+    assert labels['x/feb/Tracker.xlsx'] == 'tracker_feb_3'
+    assert len(set(labels.values())) == 4
+
+def test_generate_reports_keeps_same_named_workbooks_apart(workbook_path, tmp_path):
+    copy = tmp_path / "february" / "tracker.xlsx"
+    copy.parent.mkdir()
+    copy.write_bytes(open(workbook_path, 'rb').read())
+    written = generate_reports([workbook_path, str(copy)], [(None, None)], str(tmp_path / "out"),
+                               formats=('csv',), workers=1)
+    
+    assert len(written) == 6
+    assert (tmp_path / "out" / f"tracker_{os.path.basename(tmp_path)}_all" / "summary.csv").exists()
+    assert (tmp_path / "out" / "tracker_february_all" / "summary.csv").exists()
+
+def test_batch_report_does_not_import_streamlit():
+    code = "import sys, batch_report; sys.exit('streamlit' in sys.modules)"
+    assert subprocess.run([sys.executable, '-c', code], cwd=os.path.dirname(os.path.dirname(__file__))).returncode == 0
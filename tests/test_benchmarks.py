@@ -0,0 +1,28 @@
+"""Tests for the benchmark suite's workbook generator and regression comparison"""
+import pandas as pd
+from config import SHEET_CONFIG
+from benchmarks.run_benchmarks import compare
+from benchmarks.synthetic_workbook import generate_sheet
+from workbook_loader import sheet_columns
+
+def test_generate_sheet_is_reproducible_and_dirty():
+    sheet_name = 'Online Orders Not Invoiced'
+    df = generate_sheet(sheet_name, 2000, seed=7, dirty_fraction=0.05)
+    
+    assert list(df.columns) == sheet_columns(SHEET_CONFIG[sheet_name])
+    pd.testing.assert_frame_equal(df, generate_sheet(sheet_name, 2000, seed=7, dirty_fraction=0.05))
+    assert pd.to_numeric(df['Value$'], errors='coerce').isna().sum() == 100
+    assert df['Partner'].nunique() > 50
+    assert df['OrderID'].is_unique
+
+def test_compare_flags_only_regressions_beyond_threshold():
+    def result(seconds, peak):
+        return {'seconds_best': seconds, 'peak_bytes': peak}
+    baseline = {'results': {'10000': {'load': result(1.0, 1000), 'plot': result(0.001, 1000)}}}
+    current = {'results': {'10000': {'load': result(1.5, 1100), 'plot': result(0.004, 1000),
+                                     'new': result(9.0, 9000)}}}
+    
+    regressions = compare(current, baseline, threshold=0.2)
+    
+    assert [(r['benchmark'], r['metric']) for r in regressions] == [('load', 'seconds_best')]
+    assert regressions[0]['ratio'] == 1.5
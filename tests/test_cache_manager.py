@@ -0,0 +1,51 @@
+"""Tests for analysis memoization"""
+import pytest
+import pandas as pd
+from cache_manager import CacheManager
+
+@pytest.fixture
+def cache():
+    return CacheManager(memory_budget_bytes=1024 * 1024)
+
+def test_memoize_computes_once(cache):
+    calls = []
+    compute = lambda: calls.append(1) or 42
+    
+    assert cache.memoize('summary', compute, sheet='S', params=('2023-01-01', None), version='v1') == 42
+    assert cache.memoize('summary', compute, sheet='S', params=['2023-01-01', None], version='v1') == 42
+    assert len(calls) == 1
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+def test_invalidate_drops_only_that_version(cache):
+    cache.memoize('summary', lambda: 1, version='v1')
+    cache.memoize('summary', lambda: 2, version='v2')
+    cache.invalidate('v1')
+    
+    assert cache.memoize('summary', lambda: 3, version='v1') == 3
+    assert cache.memoize('summary', lambda: 4, version='v2') == 2
+
+def test_lru_eviction_under_budget():
+    frame = pd.DataFrame({'a': range(1000)})
+    budget = int(frame.memory_usage(deep=True).sum() * 2.5)
+    cache = CacheManager(memory_budget_bytes=budget)
+    for name in ['first', 'second', 'third']:
+        cache.memoize(name, lambda: frame.copy())
+    
+    assert cache.stats()['entries'] == 2
+    assert cache.stats()['bytes'] <= budget
+    calls = []
+    cache.memoize('first', lambda: calls.append(1) or frame)
+    assert calls == [1]
+
+def test_clear_cache_runs_registered_hooks(cache):
+    cleared = []
+    hook = lambda: cleared.append(1)
+    cache.add_clear_hook(hook)
+    cache.add_clear_hook(hook)
+    cache.memoize('summary', lambda: 1, version='v1')
+    
+    cache.clear_cache()
+    
+    assert cleared == [1]
+    assert cache.stats()['entries'] == 0
@@ -0,0 +1,43 @@
+"""Tests for in-memory sheet compaction"""
+import pytest
+import pandas as pd
+from compaction import compact_frame, frame_memory_bytes
+
+@pytest.fixture
+def sample_df():
+    return pd.DataFrame({
+        'ReceivedDate': pd.date_range('2023-01-01', periods=6, freq='D'),
+        'Value$': [100.0, 200.0, 300.0, 400.0, 500.0, 600.0],
+        'ValueinAED': [367.25, 734.5, 1101.75, 1469.0, 1836.25, 2203.5],
+        'Partner': ['Alpha', 'Beta', 'Alpha', 'Alpha', 'Beta', 'Alpha'],
+        'SO#': [5001, 'SO-5002', 5003.0, 'SO-5004', None, 'SO-5006']
+    })
+
+def test_compact_frame_dtypes(sample_df):
+    compacted = compact_frame(sample_df)
+    
+    assert isinstance(compacted['Partner'].dtype, pd.CategoricalDtype)
+    assert pd.api.types.is_integer_dtype(compacted['Value$'])
+    assert compacted['ValueinAED'].dtype == 'float64'
+    assert pd.api.types.is_datetime64_any_dtype(compacted['ReceivedDate'])
+    assert list(compacted['SO#'].iloc[:4]) == ['5001', 'SO-5002', '5003', 'SO-5004']
+    assert pd.isna(compacted['SO#'].iloc[4])
+
+def test_compact_frame_is_lossless(sample_df):
+    compacted = compact_frame(sample_df)
+    
+    assert (compacted['Value$'] == sample_df['Value$']).all()
+    assert (compacted['ValueinAED'] == sample_df['ValueinAED']).all()
+    assert list(compacted['Partner'].astype(str)) == list(sample_df['Partner'])
+
+def test_compact_frame_reduces_memory():
+    df = pd.DataFrame({'Partner': ['Partner number %d' % (i % 5) for i in range(1000)], 'Value$': [1.0] * 1000})
+    assert frame_memory_bytes(compact_frame(df)) < frame_memory_bytes(df) / 4
+
+def test_exact_columns_stay_float64():
+    df = pd.DataFrame({'Value$': [100.0, 200.0] * 50, 'Quantity': [1.0, 2.0] * 50})
+    compacted = compact_frame(df, exact_columns=['Value$', 'Missing'])
+    
+    assert compacted['Value$'].dtype == 'float64'
+    assert pd.api.types.is_integer_dtype(compacted['Quantity'])
+    assert (compacted['Value$'] * compacted['Value$']).sum() == 2500000.0
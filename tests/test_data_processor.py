@@ -2,7 +2,10 @@
 import pytest
 import pandas as pd
 from datetime import datetime
+from compaction import frame_memory_bytes
 from data_processor import DataProcessor
+from profiling import recording
+from snapshot_cache import SnapshotCache
 
 @pytest.fixture
 def processor():
@@ -28,13 +31,192 @@ def test_preprocess_sheet(processor, sample_df):
 
 def test_filter_by_date(processor, sample_df):
     sheet_name = 'Manual Orders Not Invoiced'
-    processor.sheets_data[sheet_name] = sample_df
+    processor.set_sheet_data(sheet_name, processor._preprocess_sheet(sample_df, sheet_name))
     
     start_date = datetime(2023, 1, 1)
     end_date = datetime(2023, 1, 1)
     
-    processor.filter_by_date(start_date, end_date)
-    filtered_df = processor.sheets_data[sheet_name]
+    filtered_df = processor.filter_by_date(start_date, end_date)[sheet_name]
     
     assert len(filtered_df) == 1
-    assert filtered_df.iloc[0]['Value$'] == 100
\ No newline at end of file
+    assert filtered_df.iloc[0]['Value$'] == 100
+    assert len(processor.sheets_data[sheet_name]) == 2
+
+def test_get_sheet_data_date_range(processor):
+    sheet_name = 'Manual Orders Not Invoiced'
+    df = pd.DataFrame({
+        'ReceivedDate': pd.to_datetime(['2023-01-03 15:00', '2023-01-01', '2023-01-02 09:30']),
+        'Value$': [300, 100, 200],
+        'ValueinAED': [1101, 367, 734]
+    })
+    processor.set_sheet_data(sheet_name, df)
+    
+    assert list(processor.sheets_data[sheet_name]['Value$']) == [100, 200, 300]
+    assert list(processor.get_sheet_data(sheet_name, datetime(2023, 1, 2), None)['Value$']) == [200, 300]
+    assert list(processor.get_sheet_data(sheet_name, None, datetime(2023, 1, 2))['Value$']) == [100, 200]
+    assert processor.get_sheet_data(sheet_name, datetime(2023, 2, 1), datetime(2023, 1, 1)).empty
+
+def test_preprocess_sheet_coerces_and_drops_bad_rows(processor):
+    sheet_name = 'Manual Orders Not Invoiced'
+    df = pd.DataFrame({
+        'ReceivedDate': ['2023-01-01', 'bad', '2023-01-03'],
+        'Value$': [100, 200, 'oops'],
+        'ValueinAED': [367, 734, 1101]
+    })
+    processed_df = processor._preprocess_sheet(df, sheet_name)
+    
+    assert len(processed_df) == 1
+    assert pd.api.types.is_numeric_dtype(processed_df['Value$'])
+    reports = processor.validation_reports[sheet_name]
+    assert reports['ReceivedDate'].invalid_positions.tolist() == [1]
+    assert reports['Value$'].invalid_positions.tolist() == [2]
+
+def test_query_table_searches_sorts_and_pages(processor):
+    sheet_name = 'Manual Orders Not Invoiced'
+    processor.set_sheet_data(sheet_name, pd.DataFrame({
+        'ReceivedDate': pd.date_range('2023-01-01', periods=5, freq='D'),
+        'Value$': [50, 10, 40, 20, 30],
+        'ValueinAED': [1, 2, 3, 4, 5],
+        'Reference': ['ab-1', 'AB-2', 'cd-3', 'ab-4', None],
+        'Partner': ['P1', 'P2', 'P1', 'P3', 'P1']
+    }))
+    
+    page_df, total = processor.query_table(sheet_name, search='ab', sort_by='Value$', page=0, page_size=2)
+    assert total == 3
+    assert list(page_df['Value$']) == [10, 20]
+    
+    page_df, _ = processor.query_table(sheet_name, search='ab', sort_by='Value$', page=1, page_size=2)
+    assert list(page_df['Reference']) == ['ab-1']
+    
+    csv = processor.export_table_csv(sheet_name, search='ab', sort_by='Value$', ascending=False).decode()
+    assert csv.splitlines()[0].startswith('ReceivedDate,Value$')
+    assert len(csv.splitlines()) == 4
+
+def test_get_sheet_data_with_category_filters(processor):
+    sheet_name = 'Manual Orders Not Invoiced'
+    processor.set_sheet_data(sheet_name, pd.DataFrame({
+        'ReceivedDate': pd.date_range('2023-01-01', periods=4, freq='D'),
+        'Value$': [10, 20, 30, 40],
+        'ValueinAED': [1, 2, 3, 4],
+        'Partner': ['P1', 'P2', 'P1', 'P1'],
+        'PDCstatus': ['Received', 'Received', 'Pending', 'Received']
+    }))
+    
+    filters = {'Partner': ['P1'], 'PDCstatus': ['Received']}
+    df = processor.get_sheet_data(sheet_name, datetime(2023, 1, 1), datetime(2023, 1, 3), filters=filters)
+    assert list(df['Value$']) == [10]
+    
+    summary = processor.get_rollup(sheet_name).summary(['Value$'], filters=filters)
+    assert summary['Value$']['total'] == 50
+
+def _write_tracker(path, manual_values, online_values, partners=None):
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame({
+            'ReceivedDate': [datetime(2023, 1, day) for day in range(1, len(manual_values) + 1)],
+            'Value$': manual_values,
+            'ValueinAED': [value * 3.67 if isinstance(value, (int, float)) else value for value in manual_values],
+            'Reference': [f"REF{i}" for i in range(len(manual_values))],
+            'Partner': partners or ['P1', 'P2'] * (len(manual_values) // 2) + ['P1'] * (len(manual_values) % 2)
+        }).to_excel(writer, sheet_name='Manual Orders Not Invoiced', index=False)
+        pd.DataFrame({
+            'ReceivedDate': [datetime(2023, 2, day) for day in range(1, len(online_values) + 1)],
+            'Value$': online_values,
+            'ValueinAED': [value * 3.67 for value in online_values],
+            'OrderID': [f"ORD{i}" for i in range(len(online_values))]
+        }).to_excel(writer, sheet_name='Online Orders Not Invoiced', index=False)
+
+def test_incremental_reload_reuses_unchanged_sheets_and_rows(tmp_path):
+    path = tmp_path / "tracker.xlsx"
+    _write_tracker(path, [100, 200, 300, 400], [10, 20, 30])
+    baseline = DataProcessor(str(path), snapshot_cache=SnapshotCache(str(tmp_path / "a"), 1 << 30))
+    baseline.load_data()
+    
+    # Edit one manual order, drop another and append a new one; the online sheet is untouched
+    _write_tracker(path, [100, 250, 400, 500], [10, 20, 30])
+    incremental = DataProcessor(str(path), snapshot_cache=SnapshotCache(str(tmp_path / "b"), 1 << 30))
+    with recording() as recorder:
+        incremental.load_data(baseline=baseline)
+    full = DataProcessor(str(path), snapshot_cache=SnapshotCache(str(tmp_path / "c"), 1 << 30))
+    full.load_data()
+    
+    online = 'Online Orders Not Invoiced'
+    manual = 'Manual Orders Not Invoiced'
+    assert incremental.sheets_data[online] is baseline.sheets_data[online]
+    assert incremental.rollups[online] is baseline.rollups[online]
+    pd.testing.assert_frame_equal(incremental.sheets_data[manual], full.sheets_data[manual], check_dtype=False)
+    assert incremental.rollups[manual].summary(['Value$'])['Value$'] == pytest.approx(
+        full.rollups[manual].summary(['Value$'])['Value$'])
+    assert incremental.filter_indexes[manual].options('Partner') == ['P1', 'P2']
+    # Only the three new or edited rows went through preprocessing
+    assert [span.rows for span in recorder.spans if span.name == 'DataProcessor._preprocess_sheet'] == [3]
+    assert incremental.order_indexes[online] is baseline.order_indexes[online]
+    assert incremental.find_orders('REF3', prefix=False)[manual]['Value$'].tolist() == [500]
+
+def test_incremental_reload_sorts_new_categories_like_a_full_load(tmp_path):
+    path = tmp_path / "tracker.xlsx"
+    _write_tracker(path, [100, 200, 300, 400], [10, 20, 30], partners=['Alpha', 'Zed', 'Alpha', 'Zed'])
+    baseline = DataProcessor(str(path), snapshot_cache=SnapshotCache(str(tmp_path / "a"), 1 << 30))
+    baseline.load_data()
+    
+    # A partner sorting between the existing ones arrives with the new rows
+    _write_tracker(path, [100, 200, 300, 400, 500, 600], [10, 20, 30],
+                   partners=['Alpha', 'Zed', 'Alpha', 'Zed', 'Beta', 'Beta'])
+    incremental = DataProcessor(str(path), snapshot_cache=SnapshotCache(str(tmp_path / "b"), 1 << 30))
+    incremental.load_data(baseline=baseline)
+    full = DataProcessor(str(path), snapshot_cache=SnapshotCache(str(tmp_path / "c"), 1 << 30))
+    full.load_data()
+    
+    manual = 'Manual Orders Not Invoiced'
+    pd.testing.assert_frame_equal(incremental.sheets_data[manual], full.sheets_data[manual], check_categorical=True)
+    sorted_partners = [
+        list(processor.query_table(manual, sort_by='Partner', ascending=True)[0]['Partner'])
+        for processor in (incremental, full)
+    ]
+    assert sorted_partners[0] == sorted_partners[1] == ['Alpha', 'Alpha', 'Beta', 'Beta', 'Zed', 'Zed']
+
+def test_incremental_reload_reports_cover_the_whole_sheet(tmp_path):
+    path = tmp_path / "tracker.xlsx"
+    _write_tracker(path, [100, 'bad', 300, 400], [10, 20, 30])
+    baseline = DataProcessor(str(path), snapshot_cache=SnapshotCache(str(tmp_path / "a"), 1 << 30))
+    baseline.load_data()
+    
+    # Append only: the earlier invalid cell must survive alongside the new one
+    _write_tracker(path, [100, 'bad', 300, 400, 500, 'oops'], [10, 20, 30])
+    incremental = DataProcessor(str(path), snapshot_cache=SnapshotCache(str(tmp_path / "b"), 1 << 30))
+    incremental.load_data(baseline=baseline)
+    full = DataProcessor(str(path), snapshot_cache=SnapshotCache(str(tmp_path / "c"), 1 << 30))
+    full.load_data()
+    
+    manual = 'Manual Orders Not Invoiced'
+    report = incremental.validation_reports[manual]['Value$']
+    expected = full.validation_reports[manual]['Value$']
+    assert report.invalid_positions.tolist() == expected.invalid_positions.tolist() == [1, 5]
+    assert (report.invalid_count, report.total) == (expected.invalid_count, expected.total) == (2, 6)
+    footprint = incremental.memory_footprint[manual]
+    assert footprint['after'] == frame_memory_bytes(incremental.sheets_data[manual])
+    assert footprint['before'] == pytest.approx(full.memory_footprint[manual]['before'], rel=0.2)
+
+def test_snapshot_load_keeps_memory_footprint(tmp_path):
+    path = tmp_path / "tracker.xlsx"
+    _write_tracker(path, [100, 200, 300, 400], [10, 20, 30])
+    snapshots = SnapshotCache(str(tmp_path / "a"), 1 << 30)
+    cold = DataProcessor(str(path), snapshot_cache=snapshots)
+    cold.load_data()
+    warm = DataProcessor(str(path), snapshot_cache=snapshots)
+    warm.load_data()
+    
+    assert warm.memory_footprint == cold.memory_footprint
+    assert warm.memory_report().loc['Manual Orders Not Invoiced', 'saved'] > 0
+
+def test_find_orders_searches_every_sheet(tmp_path):
+    path = tmp_path / "tracker.xlsx"
+    _write_tracker(path, [100, 200], [10, 20, 30])
+    processor = DataProcessor(str(path), snapshot_cache=SnapshotCache(str(tmp_path / "a"), 1 << 30))
+    processor.load_data()
+    
+    results = processor.find_orders('ord')
+    assert list(results) == ['Online Orders Not Invoiced']
+    assert results['Online Orders Not Invoiced']['OrderID'].tolist() == ['ORD0', 'ORD1', 'ORD2']
+    assert set(results['Online Orders Not Invoiced']['matched_on']) == {'OrderID'}
+    assert processor.find_orders('ord', limit=1)['Online Orders Not Invoiced']['OrderID'].tolist() == ['ORD0']
+    assert processor.find_orders('REF', prefix=False) == {}
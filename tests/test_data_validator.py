@@ -27,4 +27,30 @@ def test_validate_numeric_columns(validator, sample_df):
 
 def test_validate_required_columns(validator, sample_df):
     assert validator.validate_required_columns(sample_df, ['date_col', 'numeric_col']) == True
-    assert validator.validate_required_columns(sample_df, ['missing_col']) == False
\ No newline at end of file
+    assert validator.validate_required_columns(sample_df, ['missing_col']) == False
+
+def test_coerce_date_column_reports_bad_cells(validator):
+    df = pd.DataFrame({'date_col': ['2023-01-05', 'not a date', None, '2023-02-10', 12345]})
+    converted, report = validator.coerce_date_column(df, 'date_col')
+    
+    assert pd.api.types.is_datetime64_any_dtype(converted)
+    assert converted.iloc[3] == pd.Timestamp('2023-02-10')
+    assert report.invalid_count == 2
+    assert report.invalid_positions.tolist() == [1, 4]
+    assert not report.is_valid
+
+def test_coerce_date_column_infers_format(validator):
+    df = pd.DataFrame({'date_col': ['15/01/2023', '28/02/2023', '2023-03-01']})
+    converted, report = validator.coerce_date_column(df, 'date_col')
+    
+    assert report.date_format == '%d/%m/%Y'
+    assert report.is_valid
+    assert list(converted) == [pd.Timestamp('2023-01-15'), pd.Timestamp('2023-02-28'), pd.Timestamp('2023-03-01')]
+
+def test_coerce_numeric_columns(validator):
+    df = pd.DataFrame({'amount': ['100', '2.5', 'n/a', None]})
+    converted, report = validator.coerce_numeric_columns(df, ['amount', 'missing'])['amount']
+    
+    assert converted.iloc[:2].tolist() == [100.0, 2.5]
+    assert report.invalid_positions.tolist() == [2]
+    assert validator.coerce_numeric_columns(df, ['missing'])['missing'][1].missing
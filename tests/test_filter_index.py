@@ -0,0 +1,27 @@
+"""Tests for categorical filter indexes"""
+import pytest
+import pandas as pd
+from filter_index import SheetFilterIndex
+
+@pytest.fixture
+def index():
+    df = pd.DataFrame({
+        'Partner': ['A', 'B', 'A', None, 'C', 'A', 'B'],
+        'PDCstatus': ['Received', 'Pending', 'Pending', 'Received', 'Received', 'Received', 'Received']
+    })
+    return SheetFilterIndex(df, ['Partner', 'PDCstatus', 'Missing'])
+
+def test_options_skip_missing_values(index):
+    assert index.options('Partner') == ['A', 'B', 'C']
+    assert index.options('Missing') == []
+    assert list(index.columns) == ['Partner', 'PDCstatus']
+
+def test_select_intersects_filters(index):
+    assert index.select({}) is None
+    assert index.select({'Partner': []}) is None
+    assert index.select({'Partner': ['A', 'B']}).tolist() == [0, 1, 2, 5, 6]
+    assert index.select({'Partner': ['A', 'B'], 'PDCstatus': ['Received']}).tolist() == [0, 5, 6]
+    assert index.select({'Partner': ['Z']}).tolist() == []
+
+def test_select_restricts_to_position_range(index):
+    assert index.select({'Partner': ['A']}, start=1, stop=5).tolist() == [2]
@@ -0,0 +1,56 @@
+"""Tests for multi-workbook ingestion"""
+import os
+import pytest
+import numpy as np
+import pandas as pd
+from datetime import datetime
+import config
+from multi_workbook import MultiWorkbookProcessor, create_processor, latest_file_wins
+from data_processor import DataProcessor
+from workbook_loader import resolve_workbooks
+
+def _write_month(path, references, values, mtime):
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame({
+            'ReceivedDate': [datetime(2023, 1, i + 1) for i in range(len(references))],
+            'Value$': values,
+            'ValueinAED': [value * 3.67 for value in values],
+            'Reference': references,
+            'Partner': ['P1'] * len(references)
+        }).to_excel(writer, sheet_name='Manual Orders Not Invoiced', index=False)
+    os.utime(path, (mtime, mtime))
+
+@pytest.fixture
+def monthly_dir(tmp_path, monkeypatch):
+    monkeypatch.setitem(config.SNAPSHOT_CONFIG, 'enabled', False)
+    # File names sort opposite to modification times: recency decides which copy wins
+    _write_month(tmp_path / "b_january.xlsx", ['REF1', 'REF2'], [100, 200], mtime=1_700_000_000)
+    _write_month(tmp_path / "a_february.xlsx", ['REF2', 'REF3'], [250, 300], mtime=1_700_100_000)
+    (tmp_path / "~$a_february.xlsx").write_bytes(b"lock")
+    return tmp_path
+
+def test_resolve_workbooks_orders_by_modification_time(monthly_dir):
+    paths = resolve_workbooks(str(monthly_dir))
+    assert [os.path.basename(path) for path in paths] == ['b_january.xlsx', 'a_february.xlsx']
+    assert resolve_workbooks(str(monthly_dir / "*.xlsx")) == paths
+
+def test_latest_file_wins_keeps_repeats_within_a_file():
+    df = pd.DataFrame({'Reference': ['A', 'A', 'B', 'A', None, None], 'Value$': [1, 2, 3, 4, 5, 6]})
+    ranks = np.array([0, 0, 0, 1, 0, 1])
+    result = latest_file_wins(df, ranks, ['Reference'])
+    assert list(result['Value$']) == [3, 4, 5, 6]
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_multi_workbook_load_deduplicates_across_files(monthly_dir, workers):
+    processor = MultiWorkbookProcessor(str(monthly_dir), workers=workers)
+    success, _ = processor.load_data()
+    
+    assert success
+    df = processor.sheets_data['Manual Orders Not Invoiced']
+    assert dict(zip(df['Reference'], df['Value$'])) == {'REF1': 100, 'REF2': 250, 'REF3': 300}
+    assert list(processor.timing_report()['rows']) == [2, 2]
+    assert processor.source_modified_at == datetime.fromtimestamp(1_700_100_000)
+
+def test_create_processor_picks_mode(monthly_dir):
+    assert isinstance(create_processor(str(monthly_dir)), MultiWorkbookProcessor)
+    assert type(create_processor(str(monthly_dir / "b_january.xlsx"))) is DataProcessor
@@ -0,0 +1,48 @@
+"""Tests for the order identifier index"""
+import pytest
+import numpy as np
+import pandas as pd
+from order_index import OrderKeyIndex, normalize_identifiers
+
+@pytest.fixture
+def index():
+    df = pd.DataFrame({
+        'SO#': [12345.0, 12346.0, None, 12345.0, 99.0],
+        'Reference': [' ref-1', 'REF-12', 'ref-2', None, 'SO-12345'],
+        'Partner': ['A', 'B', 'C', 'D', 'E']
+    })
+    return OrderKeyIndex(df, ['SO#', 'Reference', 'Missing'])
+
+def test_normalize_identifiers_formats_whole_floats_as_digits():
+    values = normalize_identifiers(pd.Series([12345.0, None, 7.0]))
+    
+    assert values.tolist() == ['12345', '', '7']
+    assert normalize_identifiers(pd.Series([' ab ', 'Ab'])).tolist() == ['AB', 'AB']
+
+def test_exact_search_returns_every_row_holding_the_key(index):
+    found = index.search('12345', prefix=False)
+    
+    assert found['position'].tolist() == [0, 3]
+    assert set(found['matched_on']) == {'SO#'}
+    assert index.search('ref-1', prefix=False)['position'].tolist() == [0]
+    assert index.search('nothing', prefix=False).empty
+
+def test_prefix_search_lists_exact_matches_first(index):
+    found = index.search('ref-1')
+    
+    assert found['position'].tolist() == [0, 1]
+    assert found['key'].tolist() == ['REF-1', 'REF-12']
+    assert index.search('1234')['position'].tolist() == [0, 3, 1]
+    assert index.search('1234', limit=2)['position'].tolist() == [0, 3]
+    assert index.search('').empty
+
+def test_prefix_range_matches_linear_scan(index):
+    for prefix in ['1', '12', 'REF', 'REF-1', 'S', 'Z']:
+        start, stop = index.prefix_range(prefix)
+        assert sorted(index.keys[start:stop]) == sorted(key for key in index.keys if key.startswith(prefix))
+
+def test_empty_index():
+    index = OrderKeyIndex(pd.DataFrame({'Partner': ['A']}), ['SO#'])
+    
+    assert len(index) == 0
+    assert index.search('A').empty
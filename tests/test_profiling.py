@@ -0,0 +1,55 @@
+"""Tests for timing spans"""
+import json
+import pytest
+import pandas as pd
+from analytics import analyze_trends
+from cache_manager import CacheManager
+from profiling import SpanRecorder, active_recorder, recording, span, traced
+
+@pytest.fixture
+def orders():
+    return pd.DataFrame({
+        'ReceivedDate': pd.to_datetime(['2023-01-01', '2023-01-15', '2023-02-01']),
+        'Value$': [100.0, 200.0, 300.0]
+    })
+
+def test_spans_nest_and_record_rows_and_cache_hits(orders):
+    cache = CacheManager()
+    with recording() as recorder:
+        for _ in range(2):
+            cache.memoize("trends", lambda: analyze_trends(orders, 'ReceivedDate', ['Value$']), version="v1")
+    
+    names = [(span.name, span.depth) for span in recorder.spans]
+    assert names == [('cache:trends', 0), ('analyze_trends', 1), ('cache:trends', 0)]
+    assert [span.attributes['hit'] for span in recorder.spans if span.depth == 0] == [False, True]
+    assert recorder.spans[1].rows == 3
+    assert recorder.spans[0].duration_ms >= recorder.spans[1].duration_ms
+    assert active_recorder() is None
+
+def test_spans_are_noops_without_recorder(orders):
+    calls = []
+    
+    @traced()
+    def work(df):
+        calls.append(len(df))
+        return 'done'
+    
+    with span("outside") as handle:
+        handle.set(rows=10, hit=True)
+    assert work(orders) == 'done'
+    assert calls == [3]
+
+def test_export_jsonl(tmp_path):
+    recorder = SpanRecorder()
+    with recording(recorder):
+        with span("load", sheet="Orders") as handle:
+            handle.set(rows=5)
+    path = tmp_path / "spans.jsonl"
+    recorder.export_jsonl(str(path), data_version="abc")
+    
+    record = json.loads(path.read_text().splitlines()[0])
+    assert record['name'] == 'load'
+    assert record['rows'] == 5
+    assert record['data_version'] == 'abc'
+    assert record['attributes'] == {'sheet': 'Orders'}
+    assert list(recorder.to_frame()['details']) == ['sheet=Orders']
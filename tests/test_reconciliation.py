@@ -0,0 +1,55 @@
+"""Tests for cross-sheet order reconciliation"""
+import pytest
+import pandas as pd
+from datetime import date
+from data_processor import DataProcessor
+from reconciliation import KeyIndex, reconcile
+
+@pytest.fixture
+def processor():
+    processor = DataProcessor("test_data.xlsx")
+    processor.set_sheet_data('Online Orders Not Invoiced', pd.DataFrame({
+        'ReceivedDate': pd.to_datetime(['2023-01-01', '2023-01-05', '2023-02-20', '2023-03-01']),
+        'Value$': [100.0, 200.0, 300.0, 400.0],
+        'ValueinAED': [367.0, 734.0, 1101.0, 1468.0],
+        'OrderID': ['O1', 'O2', 'O3', None],
+        'SO': ['S1', 'S2', 'S3', 'S4'],
+        'Partner': pd.Categorical(['P1', 'P2', 'P1', 'P2'])
+    }))
+    processor.set_sheet_data('Online-Invoiced orders', pd.DataFrame({
+        'ReceivedDate': pd.to_datetime(['2023-01-11', '2023-03-11', '2023-03-12']),
+        'Value$': [100.0, 400.0, 400.0],
+        'ValueinAED': [367.0, 1468.0, 1468.0],
+        'OrderID': pd.Categorical(['O1', 'O9', 'O9']),
+        'SO': [' S1 ', 'S4', 'S5']
+    }))
+    return processor
+
+def test_key_index_lookup_and_duplicates():
+    index = KeyIndex(pd.Series(['A', 'B', 'A', None, 5003]))
+    assert list(index.lookup(pd.Series(['A', 'C', '5003', None]))) == [0, -1, 4, -1]
+    assert index.duplicated_values().to_dict() == {'A': 2}
+
+def test_key_index_matches_float_keys_against_int_keys():
+    # A single blank cell loads an ID column as float64
+    index = KeyIndex(pd.Series([1001.0, None, 1003.0]))
+    assert list(index.lookup(pd.Series([1001, 1003]))) == [0, 2]
+    assert list(index.lookup(pd.Series([1003.0, 'X'], dtype=object))) == [2, -1]
+
+def test_reconcile_matches_on_keys_in_order(processor):
+    online = reconcile(processor, stuck_after_days=30, as_of=date(2023, 3, 15))['Online']
+    
+    assert list(online.matched['matched_on']) == ['OrderID', 'SO']
+    assert list(online.matched['latency_days']) == [10.0, 10.0]
+    assert online.latency['median_days'] == 10.0
+    # O2 waited 69 days; O3 only 23
+    assert list(online.stuck['OrderID']) == ['O2']
+    assert online.counts['in_both'] == 2
+    assert online.duplicates.to_dict('records') == [
+        {'sheet': 'Online-Invoiced orders', 'key': 'OrderID', 'value': 'O9', 'rows': 2}
+    ]
+
+def test_reconcile_is_cached_per_version(processor):
+    first = reconcile(processor, as_of=date(2023, 3, 15))
+    assert reconcile(processor, as_of=date(2023, 3, 15)) is first
+    assert 'Manual' not in first
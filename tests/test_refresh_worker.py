@@ -0,0 +1,45 @@
+"""Tests for the background refresh worker"""
+import os
+import threading
+import time
+import pytest
+from refresh_worker import RefreshWorker
+
+class RecordingStore:
+    def __init__(self):
+        self.refreshed = threading.Event()
+        self.calls = 0
+    
+    def refresh(self, file_path):
+        self.calls += 1
+        self.refreshed.set()
+        return True, ""
+
+@pytest.fixture
+def workbook(tmp_path):
+    path = tmp_path / "tracker.xlsx"
+    path.write_bytes(b"version 1")
+    return path
+
+def test_request_refresh_runs_in_background(workbook):
+    store = RecordingStore()
+    worker = RefreshWorker(store, str(workbook), poll_interval=10).start()
+    try:
+        worker.request_refresh()
+        assert store.refreshed.wait(2)
+        assert worker.last_refresh is not None
+    finally:
+        worker.stop(2)
+
+def test_file_change_triggers_refresh(workbook):
+    store = RecordingStore()
+    worker = RefreshWorker(store, str(workbook), poll_interval=0.02).start()
+    try:
+        time.sleep(0.1)
+        assert store.calls == 0
+        workbook.write_bytes(b"version 2 with more rows")
+        assert store.refreshed.wait(2)
+        time.sleep(0.1)
+        assert store.calls == 1
+    finally:
+        worker.stop(2)
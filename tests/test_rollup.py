@@ -0,0 +1,84 @@
+"""Tests for the daily rollup cube"""
+import pytest
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from analytics import analyze_trends, generate_summary_stats
+from compaction import compact_frame
+from rollup import RollupCube
+
+@pytest.fixture
+def orders():
+    rng = np.random.default_rng(42)
+    size = 500
+    return pd.DataFrame({
+        'ReceivedDate': pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 150 * 24, size), unit='h'),
+        'Value$': rng.gamma(2.0, 500.0, size).round(2),
+        'ValueinAED': rng.gamma(2.0, 1800.0, size).round(2),
+        'Partner': rng.choice(['Alpha', 'Beta', 'Gamma'], size),
+        'PDCstatus': rng.choice(['Received', 'Pending', None], size)
+    }).sort_values('ReceivedDate', kind='mergesort').reset_index(drop=True)
+
+@pytest.fixture
+def cube(orders):
+    return RollupCube.build(orders, 'ReceivedDate', ['Value$', 'ValueinAED'], ['Partner', 'PDCstatus'])
+
+def test_summary_matches_raw(orders, cube):
+    raw = orders[(orders['ReceivedDate'] >= '2023-02-01') & (orders['ReceivedDate'] < '2023-03-16')]
+    raw = raw[raw['Partner'].isin(['Alpha', 'Gamma'])]
+    expected = generate_summary_stats(raw, ['Value$'])['Value$']
+    
+    summary = cube.summary(['Value$'], datetime(2023, 2, 1), datetime(2023, 3, 15),
+                           filters={'Partner': ['Alpha', 'Gamma']}, raw=raw)['Value$']
+    
+    for stat in ['total', 'average', 'median', 'min', 'max', 'std_dev', 'count']:
+        assert summary[stat] == pytest.approx(expected[stat])
+
+@pytest.mark.parametrize('filters', [None, {'PDCstatus': ['Pending']}])
+def test_summary_counts_rows_with_blank_categorical_dimensions(orders, filters):
+    orders = orders.assign(Partner=orders['Partner'].where(orders.index % 7 != 0, None))
+    compacted = compact_frame(orders)
+    assert isinstance(compacted['Partner'].dtype, pd.CategoricalDtype)
+    assert isinstance(compacted['PDCstatus'].dtype, pd.CategoricalDtype)
+    cube = RollupCube.build(compacted, 'ReceivedDate', ['Value$'], ['Partner', 'PDCstatus'])
+    raw = orders if filters is None else orders[orders['PDCstatus'].isin(filters['PDCstatus'])]
+    expected = generate_summary_stats(raw, ['Value$'])['Value$']
+    
+    summary = cube.summary(['Value$'], filters=filters)['Value$']
+    
+    assert summary['count'] == len(raw)
+    for stat in ['total', 'average', 'std_dev']:
+        assert summary[stat] == pytest.approx(expected[stat])
+
+def test_trends_match_raw(orders, cube):
+    expected = analyze_trends(orders, 'ReceivedDate', ['ValueinAED'])['ValueinAED']
+    trends = cube.trends(['ValueinAED'])['ValueinAED']
+    
+    pd.testing.assert_frame_equal(trends, expected, check_dtype=False)
+
+@pytest.mark.parametrize('granularity', ['day', 'week'])
+def test_finer_trends_match_raw(orders, cube, granularity):
+    expected = analyze_trends(orders, 'ReceivedDate', ['Value$'], granularity)['Value$']
+    trends = cube.trends(['Value$'], granularity=granularity)['Value$']
+    
+    pd.testing.assert_frame_equal(trends, expected, check_dtype=False)
+
+def test_empty_range(cube):
+    summary = cube.summary(['Value$'], datetime(2030, 1, 1), datetime(2030, 1, 31))['Value$']
+    assert summary['count'] == 0
+    assert summary['total'] == 0
+    assert np.isnan(summary['average'])
+
+def test_apply_delta_matches_rebuild(orders, cube):
+    removed = orders.iloc[::7]
+    added = orders.iloc[:40].assign(**{'Value$': lambda df: df['Value$'] + 1.0})
+    remaining = pd.concat([orders.drop(removed.index), added]).sort_values('ReceivedDate', kind='mergesort')
+    expected = RollupCube.build(remaining, 'ReceivedDate', ['Value$', 'ValueinAED'], ['Partner', 'PDCstatus'])
+    
+    updated = cube.apply_delta(added, removed)
+    
+    for filters in [None, {'Partner': ['Beta']}, {'PDCstatus': ['Pending']}]:
+        assert updated.summary(['Value$'], filters=filters)['Value$'] == pytest.approx(
+            expected.summary(['Value$'], filters=filters)['Value$'])
+    pd.testing.assert_frame_equal(updated.trends(['ValueinAED'])['ValueinAED'],
+                                  expected.trends(['ValueinAED'])['ValueinAED'])
@@ -0,0 +1,64 @@
+"""Tests for the process-wide shared data store"""
+import threading
+import time
+import pytest
+from cache_manager import CacheManager
+from shared_store import SharedDataStore
+
+class FakeProcessor:
+    loads = 0
+    version = 'v1'
+    
+    def __init__(self, file_path, cache_manager=None):
+        self.file_path = file_path
+        self.cache_manager = cache_manager
+        self.sheets_data = {}
+        self.data_version = None
+        self.released = False
+    
+    def load_data(self, baseline=None):
+        FakeProcessor.loads += 1
+        time.sleep(0.05)
+        self.sheets_data = {'sheet': object()}
+        self.data_version = FakeProcessor.version
+        return True, ""
+    
+    def release(self):
+        self.released = True
+
+@pytest.fixture
+def store():
+    FakeProcessor.loads = 0
+    FakeProcessor.version = 'v1'
+    return SharedDataStore(CacheManager(), processor_factory=FakeProcessor)
+
+def test_concurrent_first_load_runs_once(store):
+    threads = [threading.Thread(target=store.ensure_loaded, args=('book.xlsx',)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert FakeProcessor.loads == 1
+    assert store.current('book.xlsx').data_version == 'v1'
+
+def test_refresh_keeps_unchanged_version(store):
+    store.ensure_loaded('book.xlsx')
+    original = store.current('book.xlsx')
+    store.refresh('book.xlsx')
+    
+    assert store.current('book.xlsx') is original
+    assert not original.released
+
+def test_retired_version_released_after_last_lease(store):
+    store.ensure_loaded('book.xlsx')
+    store.cache_manager.memoize('summary', lambda: 1, version='v1')
+    
+    with store.lease('book.xlsx') as old:
+        FakeProcessor.version = 'v2'
+        store.refresh('book.xlsx')
+        assert store.current('book.xlsx').data_version == 'v2'
+        assert not old.released
+    
+    assert old.released
+    assert store.cache_manager.stats()['entries'] == 0
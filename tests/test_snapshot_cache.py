@@ -0,0 +1,65 @@
+"""Tests for the persistent snapshot cache"""
+import os
+import pytest
+import pandas as pd
+from snapshot_cache import SnapshotCache
+
+@pytest.fixture
+def cache(tmp_path):
+    return SnapshotCache(str(tmp_path / "snapshots"), max_bytes=10 * 1024 * 1024)
+
+@pytest.fixture
+def workbook(tmp_path):
+    path = tmp_path / "tracker.xlsx"
+    path.write_bytes(b"version 1")
+    return path
+
+@pytest.fixture
+def frames():
+    return {
+        'Manual Orders Not Invoiced': pd.DataFrame({
+            'ReceivedDate': pd.to_datetime(['2023-01-01', '2023-01-02']),
+            'Value$': [100.0, 200.0]
+        })
+    }
+
+def test_store_and_load_roundtrip(cache, workbook, frames):
+    key = cache.snapshot_key(str(workbook))
+    assert cache.load(key) is None
+    assert cache.store(key, frames)
+    
+    loaded = cache.load(key)
+    pd.testing.assert_frame_equal(loaded['Manual Orders Not Invoiced'], frames['Manual Orders Not Invoiced'])
+
+def test_key_changes_with_content(cache, workbook):
+    key = cache.snapshot_key(str(workbook))
+    workbook.write_bytes(b"version 2")
+    assert cache.snapshot_key(str(workbook)) != key
+
+def test_corrupt_snapshot_is_discarded(cache, workbook, frames):
+    key = cache.snapshot_key(str(workbook))
+    cache.store(key, frames)
+    snapshot_dir = os.path.join(cache.directory, key)
+    with open(os.path.join(snapshot_dir, 'sheet_0.parquet'), 'wb') as f:
+        f.write(b"not parquet")
+    
+    assert cache.load(key) is None
+    assert not os.path.exists(snapshot_dir)
+
+def test_eviction_keeps_newest(tmp_path, frames):
+    cache = SnapshotCache(str(tmp_path / "snapshots"), max_bytes=1)
+    cache.store('old', frames)
+    cache.store('new', frames)
+    
+    assert sorted(os.listdir(cache.directory)) == ['new']
+
+def test_from_config_disabled_without_parquet_engine(monkeypatch, caplog):
+    import snapshot_cache
+    monkeypatch.setattr(snapshot_cache, 'pyarrow', None)
+    monkeypatch.setattr(snapshot_cache, '_missing_engine_logged', False)
+    
+    assert SnapshotCache.from_config() is None
+    assert SnapshotCache.from_config() is None
+    assert [record.message for record in caplog.records if 'pyarrow' in record.message] == [
+        "Snapshot cache disabled: pyarrow is not installed (pip install -r requirements.txt)"
+    ]
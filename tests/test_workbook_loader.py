@@ -0,0 +1,57 @@
+"""Tests for single-pass workbook loading"""
+import pytest
+import pandas as pd
+from datetime import datetime
+from config import SHEET_CONFIG
+from workbook_loader import read_workbook_sheets, sheet_columns, sheet_fingerprints
+
+@pytest.fixture
+def workbook_path(tmp_path):
+    path = tmp_path / "tracker.xlsx"
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame({
+            'ReceivedDate': [datetime(2023, 1, 1), datetime(2023, 1, 2)],
+            'Value$': [100, 200],
+            'ValueinAED': [367, 734],
+            'Reference': ['REF1', 'REF2'],
+            'Partner': ['P1', 'P2'],
+            'Notes': ['ignored', 'ignored']
+        }).to_excel(writer, sheet_name='Manual Orders Not Invoiced', index=False)
+        pd.DataFrame({'Other': [1]}).to_excel(writer, sheet_name='Unrelated', index=False)
+    return path
+
+def test_sheet_columns_deduplicates():
+    columns = sheet_columns(SHEET_CONFIG['Manual Orders Not Invoiced'])
+    assert columns[0] == 'ReceivedDate'
+    assert columns.count('Partner') == 1
+    assert 'PDCstatus' in columns
+
+def test_read_workbook_sheets_selects_configured_columns(workbook_path):
+    frames = read_workbook_sheets(str(workbook_path), SHEET_CONFIG)
+    
+    assert list(frames.keys()) == ['Manual Orders Not Invoiced']
+    df = frames['Manual Orders Not Invoiced']
+    assert list(df.columns) == ['ReceivedDate', 'Value$', 'ValueinAED', 'Reference', 'Partner']
+    assert len(df) == 2
+    assert df.iloc[1]['Reference'] == 'REF2'
+
+def test_sheet_fingerprints_track_each_sheet(workbook_path, tmp_path):
+    sheets = ['Manual Orders Not Invoiced', 'Unrelated']
+    before = sheet_fingerprints(str(workbook_path), sheets)
+    assert set(before) == set(sheets)
+    
+    with pd.ExcelWriter(workbook_path) as writer:
+        pd.DataFrame({
+            'ReceivedDate': [datetime(2023, 1, 1), datetime(2023, 1, 2)],
+            'Value$': [100, 201],
+            'ValueinAED': [367, 734],
+            'Reference': ['REF1', 'REF2'],
+            'Partner': ['P1', 'P2'],
+            'Notes': ['ignored', 'ignored']
+        }).to_excel(writer, sheet_name='Manual Orders Not Invoiced', index=False)
+        pd.DataFrame({'Other': [1]}).to_excel(writer, sheet_name='Unrelated', index=False)
+    after = sheet_fingerprints(str(workbook_path), sheets)
+    
+    assert after['Manual Orders Not Invoiced'] != before['Manual Orders Not Invoiced']
+    assert after['Unrelated'] == before['Unrelated']
+    assert sheet_fingerprints(str(tmp_path / "missing.xlsx"), sheets) == {}
@@ -0,0 +1,111 @@
+"""Single-pass workbook loading functionality"""
+import glob
+import os
+import pandas as pd
+import logging
+import zipfile
+from typing import Dict, List, Optional
+from xml.etree import ElementTree
+from openpyxl import load_workbook
+from profiling import traced
+
+logger = logging.getLogger(__name__)
+
+MAIN_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+REL_ID = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id'
+# Parts every worksheet's cell values depend on: shared strings and number formats
+SHARED_PARTS = ['xl/sharedStrings.xml', 'xl/styles.xml']
+WORKBOOK_PATTERN = '*.xlsx'
+
+def sheet_columns(config: Dict) -> List[str]:
+    """Return every column a sheet configuration refers to, in a stable order"""
+    columns = [config['date_column']] + config['value_columns'] + config['key_columns'] + config['filter_columns']
+    return list(dict.fromkeys(columns))
+
+def _read_worksheet(worksheet, columns: List[str]) -> pd.DataFrame:
+    """Stream a read-only worksheet, keeping only the requested columns"""
+    rows = worksheet.iter_rows(values_only=True)
+    header = next(rows, None)
+    if header is None:
+        return pd.DataFrame(columns=columns)
+
+    # First occurrence wins, matching how pandas resolves duplicate headers
+    positions: Dict[str, int] = {}
+    for position, name in enumerate(header):
+        if name is not None:
+            positions.setdefault(str(name).strip(), position)
+
+    selected = [(name, positions[name]) for name in columns if name in positions]
+    if not selected:
+        return pd.DataFrame()
+
+    names = [name for name, _ in selected]
+    indexes = [position for _, position in selected]
+    records = []
+    for row in rows:
+        record = tuple(row[i] if i < len(row) else None for i in indexes)
+        if any(value is not None for value in record):
+            records.append(record)
+
+    return pd.DataFrame.from_records(records, columns=names)
+
+@traced()
+def read_workbook_sheets(file_path: str, sheet_config: Dict[str, Dict],
+                         sheet_names: Optional[List[str]] = None) -> Dict[str, pd.DataFrame]:
+    """Open the workbook once and stream every configured sheet in read-only mode"""
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        frames = {}
+        for sheet_name in sheet_names or list(sheet_config.keys()):
+            if sheet_name not in workbook.sheetnames:
+                logger.error(f"Sheet {sheet_name} not found in {file_path}")
+                continue
+            frames[sheet_name] = _read_worksheet(workbook[sheet_name], sheet_columns(sheet_config[sheet_name]))
+        return frames
+    finally:
+        workbook.close()
+
+def sheet_fingerprints(file_path: str, sheet_names: List[str]) -> Dict[str, str]:
+    """Fingerprint each worksheet from CRCs in the zip directory, without parsing any cells"""
+    try:
+        with zipfile.ZipFile(file_path) as archive:
+            names = set(archive.namelist())
+            # A sheet is only unchanged if the parts its values are decoded from are unchanged too
+            shared = ':'.join(
+                f"{archive.getinfo(part).CRC:08x}{archive.getinfo(part).file_size:x}"
+                for part in SHARED_PARTS if part in names
+            )
+            workbook = ElementTree.fromstring(archive.read('xl/workbook.xml'))
+            relationships = ElementTree.fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+            targets = {rel.get('Id'): rel.get('Target') for rel in relationships}
+
+            fingerprints = {}
+            for sheet in workbook.iter(f'{MAIN_NS}sheet'):
+                name = sheet.get('name')
+                target = targets.get(sheet.get(REL_ID))
+                if name not in sheet_names or target is None:
+                    continue
+                part = target.lstrip('/') if target.startswith('/') else f"xl/{target}"
+                if part in names:
+                    info = archive.getinfo(part)
+                    fingerprints[name] = f"{info.CRC:08x}{info.file_size:x}:{shared}"
+            return fingerprints
+    except (OSError, KeyError, zipfile.BadZipFile, ElementTree.ParseError) as e:
+        logger.warning(f"Unable to fingerprint sheets of {file_path}: {e}")
+        return {}
+
+def is_workbook_collection(source: str) -> bool:
+    """Whether a source names several workbooks (a directory or a glob) rather than one file"""
+    return os.path.isdir(source) or any(char in source for char in '*?[')
+
+def resolve_workbooks(source: str) -> List[str]:
+    """Workbooks named by a file, directory or glob, oldest first so that later files win on duplicates"""
+    if os.path.isdir(source):
+        paths = glob.glob(os.path.join(source, WORKBOOK_PATTERN))
+    elif is_workbook_collection(source):
+        paths = glob.glob(source)
+    else:
+        return [source]
+    # Skip the lock files Excel leaves next to open workbooks
+    paths = [path for path in paths if os.path.isfile(path) and not os.path.basename(path).startswith('~$')]
+    return sorted(paths, key=lambda path: (os.path.getmtime(path), path))